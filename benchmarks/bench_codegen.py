@@ -0,0 +1,58 @@
+"""compare generated from_dict with validating then constructing by hand
+
+    python benchmarks/bench_codegen.py [repeat]
+"""
+import json
+import sys
+import timeit
+
+from yaddle import loads
+from yaddle.codegen import load_classes
+from yaddle.validator import compile_schema
+
+SOURCE = """
+@user:
+    name: str{3,20}
+    age: int{10,200}
+    email?: %email
+    roles: [admin | author]
+    address?:
+        city: str
+        zip: int
+
+users: [@user]
+"""
+
+USER = {"name": "someone", "age": 30, "email": "someone@example.com",
+        "roles": ["admin", "author"], "address": {"city": "x", "zip": 1}}
+PAYLOAD = json.dumps({"users": [USER] * 100})
+
+
+def bench(repeat):
+    classes = load_classes(SOURCE)
+    (Root, User, Address) = (classes["Root"], classes["User"],
+                             classes["UserAddress"])
+    validate = compile_schema(loads(SOURCE))
+
+    def by_hand(data):
+        validate(data)
+        users = []
+        for user in data["users"]:
+            address = user.get("address")
+            if address is not None:
+                address = Address(address["city"], address["zip"])
+            users.append(User(user["name"], user["age"], user["roles"],
+                              user.get("email"), address))
+        return Root(users)
+
+    generated = Root.from_dict
+    assert by_hand(json.loads(PAYLOAD)) == generated(json.loads(PAYLOAD))
+    for (name, construct) in [("validate + construct", by_hand),
+                              ("from_dict", generated)]:
+        best = min(timeit.repeat(lambda: construct(json.loads(PAYLOAD)),
+                                 number=100, repeat=repeat)) / 100
+        print("%-22s %8.1fus" % (name, best * 1e6))
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,47 @@
+"""compare the built-in format checkers with typical regex checkers
+
+    python benchmarks/bench_formats.py [repeat]
+
+inputs are crafted to trigger backtracking in the regexes, sizes are kept
+small enough that the slowest regex still finishes in seconds
+"""
+import re
+import sys
+import timeit
+
+from yaddle import formats
+
+REGEXES = {
+    "email": r"^([a-zA-Z0-9])(([\-.]|[_]+)?([a-zA-Z0-9]+))*(@){1}[a-z0-9]+"
+             r"[.]{1}(([a-z]{2,3})|([a-z]{2,3}[.]{1}[a-z]{2,3}))$",
+    "hostname": r"^(([a-z0-9]+-?)*[a-z0-9]\.)*([a-z0-9]+-?)*[a-z0-9]$",
+    "uri": r"^([a-z][a-z0-9+.-]*):(([a-z0-9\-._~!$&'()*+,;=:@/?]|"
+           r"%[0-9a-f]{2})*)*$",
+    "date-time": r"^(\d+)+-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?"
+                 r"(Z|[+-]\d{2}:\d{2})$",
+}
+
+INPUTS = {
+    "email": "a" * 20 + "!",
+    "hostname": "a" * 20 + "!",
+    "uri": "http:" + "a" * 18 + " ",
+    "date-time": "1" * 22 + "x",
+}
+
+
+def bench(repeat):
+    print("%-10s %12s %12s" % ("format", "checker", "regex"))
+    for (name, source) in sorted(REGEXES.items()):
+        value = INPUTS[name]
+        checker = formats.get_format(name)
+        match = re.compile(source, re.I).match
+        assert not checker(value) and not match(value)
+        fast = min(timeit.repeat(lambda: checker(value),
+                                 number=1000, repeat=repeat)) / 1000
+        slow = min(timeit.repeat(lambda: match(value),
+                                 number=1, repeat=repeat))
+        print("%-10s %10.2fus %10.2fus" % (name, fast * 1e6, slow * 1e6))
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,89 @@
+"""load test a running ``python -m yaddle.server``
+
+    python -m yaddle.server schemas/ &
+    python benchmarks/loadtest.py user document.json -c 8 -n 2000
+
+every client thread keeps one connection alive and posts the document n
+times, latencies are measured on the client, a client stops at its first
+reply that isn't 200 and the script then exits with an error
+"""
+import argparse
+import threading
+import time
+
+try:
+    from http.client import HTTPConnection
+except ImportError:
+    from httplib import HTTPConnection
+
+
+def client(host, port, path, body, count, latencies, failures):
+    "post body count times, stop at the first failure and record it"
+    conn = HTTPConnection(host, port)
+    headers = {"Content-Type": "application/json"}
+    try:
+        for _ in range(count):
+            started = time.time()
+            conn.request("POST", path, body, headers)
+            response = conn.getresponse()
+            reply = response.read()
+            if response.status != 200:
+                failures.append("HTTP %d %s" % (
+                    response.status, reply.decode("utf-8", "replace")))
+                return
+            latencies.append(time.time() - started)
+    except Exception as e:
+        failures.append("%s: %s" % (type(e).__name__, e))
+    finally:
+        conn.close()
+
+
+def percentile(latencies, p):
+    return latencies[min(len(latencies) - 1, len(latencies) * p // 100)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("schema")
+    parser.add_argument("document", help="json file to post")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("-c", "--concurrency", type=int, default=4)
+    parser.add_argument("-n", "--requests", type=int, default=1000,
+                        help="requests per client")
+    parser.add_argument("--batch", type=int, default=0,
+                        help="post arrays of this many documents")
+    args = parser.parse_args()
+
+    with open(args.document) as fp:
+        body = fp.read().strip()
+    path = "/validate/" + args.schema
+    if args.batch:
+        body = "[" + ",".join([body] * args.batch) + "]"
+        path += "?batch"
+
+    (latencies, failures) = ([], [])
+    threads = [threading.Thread(target=client, args=(
+        args.host, args.port, path, body, args.requests, latencies,
+        failures)) for _ in range(args.concurrency)]
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+    if failures:
+        raise SystemExit("%d of %d clients failed, first error: %s"
+                         % (len(failures), len(threads), failures[0]))
+
+    latencies.sort()
+    documents = len(latencies) * max(args.batch, 1)
+    print("requests   %d in %.2fs" % (len(latencies), elapsed))
+    print("throughput %.0f requests/s, %.0f documents/s"
+          % (len(latencies) / elapsed, documents / elapsed))
+    for p in (50, 90, 99):
+        print("p%d        %.3fms" % (p, percentile(latencies, p) * 1000))
+
+
+if __name__ == '__main__':
+    main()
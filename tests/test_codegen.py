@@ -0,0 +1,113 @@
+from yaddle.codegen import generate_code, load_classes
+from yaddle.validator import ValidationError
+import pytest
+
+SOURCE = """
+@role: admin | author | "100%"
+
+@user:
+    name: str{3,20}
+    age: int{10,200}
+    email?: %email
+    roles: [@role]
+    tags?: [/^[a-z]+$/]!
+    address?:
+        city: str
+        zip-code: int
+    extra: str | null
+
+owner: @user
+members: [@user]{,2}
+"""
+
+USER = {"name": "foo", "age": 20, "roles": ["admin"], "extra": None}
+
+
+def test_generate_code():
+    code = generate_code(SOURCE)
+    assert "class User(object):" in code
+    assert "class UserAddress(object):" in code
+    assert "class Root(object):" in code
+    compile(code, "<test>", "exec")
+
+
+def test_from_dict():
+    classes = load_classes(SOURCE)
+    assert sorted(classes) == ["Root", "User", "UserAddress"]
+    (Root, User) = (classes["Root"], classes["User"])
+    assert User.__slots__ == ("name", "age", "email", "roles", "tags",
+                              "address", "extra")
+
+    member = dict(USER, address={"city": "x", "zip-code": 1},
+                  tags=["a", "b"], email="foo@example.com")
+    data = {"owner": USER, "members": [member]}
+    root = Root.from_dict(data)
+    assert isinstance(root.owner, User)
+    assert root.owner.email is None
+    assert root.members[0].address.zip_code == 1
+    assert root.members[0].tags == ["a", "b"]
+    assert root.to_dict() == data
+    assert root == Root.from_dict(data)
+    assert User("foo", 20, ["admin"], None).to_dict() == USER
+
+
+@pytest.mark.parametrize("data, message", [
+    ({"owner": dict(USER, name="fo")}, "owner/name: shorter than 3"),
+    ({"owner": dict(USER, age=True)}, "owner/age: expected integer"),
+    ({"owner": dict(USER, roles=["x"])},
+     "owner/roles/0: 'x' not in ['admin', 'author', '100%']"),
+    ({"owner": dict(USER, tags=["a", "a"])},
+     "owner/tags: items are not unique"),
+    ({"owner": dict(USER, tags=["A"])},
+     "owner/tags/0: 'A' does not match /^[a-z]+$/"),
+    ({"owner": dict(USER, email="foo")},
+     "owner/email: 'foo' is not a valid email"),
+    ({"owner": dict(USER, extra=1)},
+     "owner/extra: must match exactly one of oneOf"),
+    ({"owner": dict(USER, address={"city": "x"})},
+     "owner/address: missing zip-code"),
+    ({"owner": dict(USER, age=1, nick="x")}, "owner: unexpected nick"),
+    ({"owner": USER, "members": [USER] * 3}, "members: more than 2 items"),
+    ({"owner": USER}, "missing members"),
+])
+def test_from_dict_invalid(data, message):
+    Root = load_classes(SOURCE)["Root"]
+    with pytest.raises(ValidationError) as e:
+        Root.from_dict(data)
+    assert str(e.value) == message
+
+
+def test_generate_code_requires_object():
+    with pytest.raises(ValueError):
+        generate_code("[str]")
+
+
+def test_from_dict_multiple_of():
+    Root = load_classes("n: int{,,3}\nx?: num{,,0.5}")["Root"]
+    assert Root.from_dict({"n": 3 * 10 ** 400}).n == 3 * 10 ** 400
+    for data in [{"n": 10 ** 400}, {"n": 3, "x": 1e308}]:
+        with pytest.raises(ValidationError):
+            Root.from_dict(data)
+
+
+def test_class_names_are_unique():
+    classes = load_classes("@root:\n    a: str\nb: @root\nc:\n    d: int\n"
+                           "@root-c:\n    e: bool")
+    assert sorted(classes) == ["Root", "Root2", "RootC", "RootC2"]
+    root = classes["Root"].from_dict({"b": {"a": "x"}, "c": {"d": 1}})
+    assert isinstance(root.b, classes["Root2"])
+    assert isinstance(root.c, classes["RootC2"])
+    assert classes["RootC"].from_dict({"e": True}).e is True
+
+
+def test_attribute_names():
+    Root = load_classes("self: str\na-b: int\na_b: int\nto_dict?: str\n"
+                        "__eq__?: str\nclass?: str")["Root"]
+    assert Root.__slots__ == ("self_", "a_b", "a_b_", "to_dict_", "_eq__",
+                              "class_")
+    data = {"self": "x", "a-b": 1, "a_b": 2, "to_dict": "y", "__eq__": "z",
+            "class": "c"}
+    root = Root.from_dict(data)
+    assert (root.self_, root.a_b, root.a_b_) == ("x", 1, 2)
+    assert root.to_dict() == data
+    assert Root("x", 1, 2, to_dict_="y").to_dict_ == "y"
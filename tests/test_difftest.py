@@ -0,0 +1,88 @@
+from yaddle import difftest, tokenize, parse
+import random
+import pytest
+
+
+@pytest.fixture
+def backend():
+    names = []
+
+    def register(name, tokenize, parse):
+        names.append(name)
+        difftest.register_backend(name, tokenize, parse)
+    yield register
+    for name in names:
+        difftest.unregister_backend(name)
+
+
+def test_generated_sources_are_valid():
+    generator = difftest.SourceGenerator(random.Random(0))
+    reference = difftest._backends[difftest.REFERENCE]
+    for _ in range(200):
+        source = generator.source()
+        (result, _) = difftest.outcome(reference, source)
+        assert result[0] == "ok", source
+
+
+def test_mutated_sources_are_rejected():
+    generator = difftest.SourceGenerator(random.Random(0))
+    reference = difftest._backends[difftest.REFERENCE]
+    results = [difftest.outcome(reference,
+                                generator.mutate(generator.source()))[0][0]
+               for _ in range(200)]
+    assert results.count("error") > 50
+
+
+def test_identical_backend(backend):
+    backend("copy", lambda source: list(tokenize(source)), parse)
+    report = difftest.run(100, seed=1).check()
+    assert report.sources == 100
+    assert 0 < report.errors < 100
+    assert sorted(report.timings) == ["copy", "reference"]
+
+
+def test_mismatch(backend):
+    def parse_without_enums(tokens):
+        (tp, val) = parse(tokens)
+        return ("string", (None, None)) if tp == "enum" else (tp, val)
+
+    def tokenize_without_indent_errors(source):
+        try:
+            return list(tokenize(source))
+        except Exception:
+            raise ValueError("bad source")
+
+    backend("broken", tokenize, parse_without_enums)
+    backend("vague", tokenize_without_indent_errors, parse)
+    report = difftest.run(100, seed=2)
+    failed = set(name for (name, _, _, _) in report.mismatches)
+    assert failed == set(["broken", "vague"])
+    with pytest.raises(AssertionError):
+        report.check()
+
+
+def test_sources_do_not_depend_on_backends(backend):
+    sources = []
+
+    def tokenize_recording(source):
+        sources.append(source)
+        return tokenize(source)
+
+    backend("recording", tokenize_recording, parse)
+    difftest.run(20, seed=3)
+    backend("copy", tokenize, parse)
+    difftest.run(20, seed=3)
+    assert sources[:20] == sources[20:]
+
+
+def test_budget(backend):
+    backend("slow", tokenize, parse)
+    report = difftest.Report()
+    report.timings.update(reference=2.0, slow=3.0)
+    assert report.ratios() == {"reference": 1.0, "slow": 1.5}
+    report.check()
+    report.check(budget=1.5)
+    with pytest.raises(AssertionError) as e:
+        report.check(budget=1.2)
+    assert str(e.value) == "slow takes 1.50x the reference, budget is 1.20x"
+    assert "slow" in report.summary()
@@ -0,0 +1,67 @@
+from yaddle import formats
+
+
+def test_date_time():
+    assert formats.is_date_time("2015-02-28T10:00:00Z")
+    assert formats.is_date_time("2016-02-29T23:59:60.123+08:00")
+    assert not formats.is_date_time("2015-02-29T10:00:00Z")
+    assert not formats.is_date_time("2015-02-28T24:00:00Z")
+    assert not formats.is_date_time("2015-02-28T10:00:00")
+    assert not formats.is_date_time("2015-02-28T10:00:00.Z")
+    assert not formats.is_date_time("1" * 10000)
+
+
+def test_email():
+    assert formats.is_email("zf.pascal@gmail.com")
+    assert formats.is_email("a+b@localhost")
+    assert not formats.is_email("@example.com")
+    assert not formats.is_email("a..b@example.com")
+    assert not formats.is_email("a@-example.com")
+    assert not formats.is_email("a" * 10000 + "!")
+
+
+def test_hostname():
+    assert formats.is_hostname("example.com")
+    assert formats.is_hostname("example.com.")
+    assert not formats.is_hostname("exa_mple.com")
+    assert not formats.is_hostname("a" * 64 + ".com")
+    assert not formats.is_hostname("a..com")
+
+
+def test_ip():
+    assert formats.is_ipv4("192.168.0.1")
+    assert not formats.is_ipv4("192.168.0.256")
+    assert not formats.is_ipv4("192.168.00.1")
+    assert not formats.is_ipv4("1.2.3")
+    assert formats.is_ipv6("::1")
+    assert formats.is_ipv6("::")
+    assert formats.is_ipv6("2001:db8::8a2e:370:7334")
+    assert formats.is_ipv6("1:2:3:4:5:6:7:8")
+    assert formats.is_ipv6("::ffff:192.0.2.1")
+    assert formats.is_ipv6("1:2:3:4:5:6:192.0.2.1")
+    assert not formats.is_ipv6("1:2:3:4:5:6:7")
+    assert not formats.is_ipv6("1::2::3")
+    assert not formats.is_ipv6("1:2:3:4:5:6:7:8:9")
+    assert not formats.is_ipv6("12345::")
+
+
+def test_uri():
+    assert formats.is_uri("http://example.com/a?b=c#d")
+    assert formats.is_uri("urn:isbn:0451450523")
+    assert formats.is_uri("http://example.com/%20")
+    assert not formats.is_uri("example.com")
+    assert not formats.is_uri("http://example.com/a b")
+    assert not formats.is_uri("http://example.com/%2")
+
+
+def test_register_format():
+    assert formats.check_format("even", "abc")
+    formats.register_format("even", lambda s: len(s) % 2 == 0)
+    try:
+        assert "even" in formats.formats()
+        assert formats.check_format("even", "ab")
+        assert not formats.check_format("even", "abc")
+        assert formats.check_format("even", 3)
+    finally:
+        formats.unregister_format("even")
+    assert formats.check_format("even", "abc")
@@ -0,0 +1,125 @@
+from yaddle import loads
+from yaddle.infer import Shape, infer, infer_lines, shards, to_yaddle, main
+from yaddle.validator import compile_schema
+import json
+import pytest
+
+SAMPLES = [
+    {"id": 1, "name": "alice", "role": "admin", "score": 1.5,
+     "tags": ["a", "b"], "address": {"city": "x", "zip": "123"},
+     "items": [{"sku": "a1", "qty": 2}], "weird key": 1},
+    {"id": 2, "name": "bob", "role": "author", "score": None, "tags": [],
+     "address": {"city": "y"}, "items": [], "meta": {"a": 1}},
+    {"id": 30, "name": "carol", "role": "admin", "score": 3, "tags": ["c"],
+     "address": {"city": "z", "zip": "4"},
+     "items": [{"sku": "b", "qty": 1, "note": "x"}], "meta": None},
+    {"id": 4, "name": "dave-o", "role": "author", "score": -2.25,
+     "address": {"city": "w"}, "items": [], "flag": True},
+]
+
+
+def test_to_yaddle():
+    source = to_yaddle(infer(SAMPLES))
+    assert source == """@items_item:
+    sku: str{1,2}
+    qty: int{1,2}
+    note?: str{1,1}
+@meta:
+    a: int{1,1}
+id: int{1,30}
+name: str{3,6}
+role: admin | author
+score: num{-2.25,3} | null
+tags?: [str{1,1}]{0,2}
+address:
+    city: str{1,1}
+    zip?: str{1,3}
+items: [@items_item]{0,1}
+meta?: @meta | null
+flag?: bool
+...
+"""
+    validate = compile_schema(loads(source))
+    for sample in SAMPLES:
+        validate(sample)
+
+
+def test_round_trip_scalars():
+    for (samples, expected) in [
+            ([1, 2, 3], "int{1,3}\n"),
+            (["a", "a", "b", "b", None], "a | b | null\n"),
+            (["str", "str", "x y", "x y"], '"str" | "x y"\n'),
+            (['a"', 'a"'], "str{2,2}\n"),
+            ([1e300, 2.5], "num{2.5,}\n"),
+            ([[], [1, "a"]], "[str{1,1} | int{1,1}]{0,2}\n"),
+            ([{}], "...\n"),
+            ([1234567890123456789, 1234567890123456791],
+             "int{1234567890123456768,1234567890123457024}\n"),
+            ([-2 ** 64 - 1, 2 ** 64 + 1],
+             "int{-18446744073709555712,18446744073709555712}\n")]:
+        source = to_yaddle(infer(samples))
+        assert source == expected
+        validate = compile_schema(loads(source))
+        for sample in samples:
+            validate(sample)
+
+
+def test_limits():
+    shape = infer(["a", "b", "c", "a", "b", "c"], enum_limit=2)
+    assert to_yaddle(shape) == "str{1,1}\n"
+    shape = infer([{"a": 1}, {"b": 1}, {"c": 1}], key_limit=2)
+    assert shape.keys is None
+    assert to_yaddle(shape) == "...\n"
+
+
+def test_no_samples(tmpdir):
+    with pytest.raises(ValueError):
+        to_yaddle(infer([]))
+    path = tmpdir.join("empty.ndjson")
+    path.write("\n\n")
+    with pytest.raises(SystemExit):
+        main([str(path)])
+
+
+def test_objects_need_object_root():
+    with pytest.raises(ValueError):
+        to_yaddle(infer([[{"a": 1}]]))
+
+
+def test_merge_and_state():
+    whole = infer(SAMPLES)
+    merged = infer(SAMPLES[:1]).merge(infer(SAMPLES[1:3]))
+    merged.merge(Shape.from_state(json.loads(json.dumps(
+        infer(SAMPLES[3:]).to_state()))))
+    assert to_yaddle(merged) == to_yaddle(whole)
+    assert Shape.from_state(whole.to_state()).to_state() == whole.to_state()
+
+
+def test_infer_lines_sharded(tmpdir):
+    path = tmpdir.join("samples.ndjson")
+    path.write("\n".join(json.dumps(sample) for sample in SAMPLES) + "\n\n")
+    whole = infer_lines(str(path))
+    assert to_yaddle(whole) == to_yaddle(infer(SAMPLES))
+    for jobs in range(1, 8):
+        merged = Shape()
+        for (p, start, end) in shards([str(path)], jobs):
+            merged.merge(infer_lines(p, start, end))
+        assert merged.to_state() == whole.to_state()
+
+    path.write('{"a": 1}\n{"a": \n')
+    with pytest.raises(ValueError) as e:
+        infer_lines(str(path))
+    assert "byte 9" in str(e.value)
+
+
+def test_main(tmpdir, capsys):
+    paths = []
+    for (i, sample) in enumerate(SAMPLES):
+        path = tmpdir.join("%d.ndjson" % i)
+        path.write(json.dumps(sample) + "\n")
+        paths.append(str(path))
+    states = [str(tmpdir.join("a.state")), str(tmpdir.join("b.state"))]
+    main(paths[:2] + ["--state", states[0]])
+    main(paths[2:] + ["--state", states[1]])
+    main(["--merge"] + states)
+    assert capsys.readouterr().out == to_yaddle(infer(SAMPLES))
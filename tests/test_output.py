@@ -0,0 +1,72 @@
+from yaddle import loads, output, tool
+import hashlib
+import json
+import pytest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+SOURCE = """
+@role: admin | "h\u00e9llo" | 1.5
+user:
+    name: str{3,20}
+    roles: [@role]{1,}!
+    tags: [str, int]
+    location?:
+        x: num
+        y: num
+"""
+
+
+def test_dumps_matches_json():
+    schema = loads(SOURCE)
+    assert output.dumps(schema, "pretty") == json.dumps(
+        schema, sort_keys=True, indent=4, separators=(",", ": "))
+    assert output.dumps(schema, "compact") == json.dumps(
+        schema, separators=(",", ":"))
+    assert output.dumps(schema, "canonical") == json.dumps(
+        schema, sort_keys=True, separators=(",", ":"))
+    for value in [{}, [], {"a": []}, [{}], 1, None, "x"]:
+        assert output.dumps(value) == json.dumps(value, sort_keys=True,
+                                                 separators=(",", ":"))
+    with pytest.raises(ValueError):
+        output.dumps(schema, "fancy")
+
+
+def test_canonical_is_stable():
+    schema = loads(SOURCE)
+    shuffled = json.loads(json.dumps(schema, sort_keys=True))
+    assert list(shuffled) != list(schema)
+    assert output.dumps(shuffled) == output.dumps(schema)
+    assert output.schema_hash(shuffled) == output.schema_hash(schema)
+    assert output.schema_hash(schema) != output.schema_hash(loads("str"))
+
+
+def test_dump_with_hasher():
+    schema = loads(SOURCE)
+    fp = StringIO()
+    hasher = hashlib.sha256()
+    output.dump(schema, fp, "canonical", hasher)
+    assert fp.getvalue() == output.dumps(schema)
+    assert hasher.hexdigest() == output.schema_hash(schema)
+    assert hasher.hexdigest() == hashlib.sha256(
+        fp.getvalue().encode("utf-8")).hexdigest()
+
+
+def test_tool(tmpdir, capsys):
+    infile = tmpdir.join("schema.ydl")
+    infile.write(SOURCE)
+    outfile = tmpdir.join("schema.json")
+    schema = loads(SOURCE)
+    for (flags, expected) in [
+            ([], output.dumps(schema, "pretty")),
+            (["--compact"], output.dumps(schema, "compact")),
+            (["--canonical"], output.dumps(schema, "canonical")),
+            (["--hash"], output.dumps(schema, "canonical"))]:
+        tool.main(flags + [str(infile), str(outfile)])
+        assert outfile.read() == expected + "\n"
+    assert capsys.readouterr().err == output.schema_hash(schema) + "\n"
+    with pytest.raises(SystemExit):
+        tool.main(["--hash", "--compact", str(infile)])
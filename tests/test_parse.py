@@ -61,6 +61,12 @@ def test_parse_enum():
     expected = ("enum", ["c", 1, -10.1, 0, True, False, None, "null", "0.1"])
     assert parse(tokenize(input)) == expected
 
+    input = 'a | b | null'
+    assert parse(tokenize(input)) == ("enum", ["a", "b", None])
+
+    input = 'a | 0'
+    assert parse(tokenize(input)) == ("enum", ["a", 0])
+
 
 def test_parse_bool():
     input = "bool"
@@ -0,0 +1,48 @@
+from yaddle import loads, patterns
+from yaddle.validator import compile_schema
+import warnings
+import pytest
+
+
+def test_compile_pattern_cached():
+    patterns.clear_cache()
+    compiled = patterns.compile_pattern("^[a-z]+$")
+    assert patterns.compile_pattern("^[a-z]+$") is compiled
+    assert compiled.match("abc")
+
+
+def test_cache_bounded(monkeypatch):
+    patterns.clear_cache()
+    monkeypatch.setattr(patterns, "CACHE_SIZE", 2)
+    patterns.compile_pattern("a")
+    patterns.compile_pattern("b")
+    patterns.compile_pattern("a")
+    patterns.compile_pattern("c")
+    assert list(patterns._cache) == ["a", "c"]
+
+
+def test_bad_pattern_fails_on_load():
+    with pytest.raises(ValueError) as e:
+        loads("name: /[a-z/")
+    assert str(e.value).startswith("Bad pattern /[a-z/: ")
+
+
+def test_is_unsafe():
+    for pattern in ["(a+)+", "^(/[^/]+)*$", "(a*b?)*c", "((ab)+c)+",
+                    "(\\d+)+$", "(?:x+){2,}", "(a+)+?"]:
+        assert patterns.is_unsafe(pattern), pattern
+    for pattern in ["a+b+", "^(/[^/]+)$", "(ab)+", "[(a+)]+", "\\(a+\\)+",
+                    "(a{2,4})+", "(a+){3}", "^[a-f0-9]{8}-[a-f0-9]{4}$"]:
+        assert not patterns.is_unsafe(pattern), pattern
+
+
+def test_check_patterns_warns():
+    schema = loads("path: /^(/[^/]+)+$/\nname: /^[a-z]+$/")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        compile_schema(schema)
+        assert not caught
+        compile_schema(schema, check_patterns=True)
+    assert len(caught) == 1
+    assert issubclass(caught[0].category, patterns.UnsafePatternWarning)
+    assert "/^(/[^/]+)+$/" in str(caught[0].message)
@@ -0,0 +1,87 @@
+from yaddle import loads
+from yaddle.registry import Registry
+from yaddle.validator import ValidationError
+import multiprocessing
+import pytest
+
+USER = """
+@role: admin | author
+name: str{3,20}
+roles: [@role]
+"""
+
+
+def _validate_in_worker(path, name, value):
+    with Registry.attach(path) as registry:
+        try:
+            registry.validate(name, value)
+        except ValidationError as e:
+            return str(e)
+        return "ok"
+
+
+def test_registry():
+    registry = Registry()
+    registry.add("user", USER)
+    registry.add("tag", "str{1,}")
+    assert registry.names() == ["tag", "user"]
+    assert "user" in registry and len(registry) == 2
+    assert registry.schema("user") == loads(USER)
+    assert registry.validator("user") is registry.validator("user")
+    registry.validate("user", {"name": "foo", "roles": ["admin"]})
+    with pytest.raises(ValidationError):
+        registry.validate("tag", "")
+    assert registry.freeze() is registry
+
+
+def test_add_file(tmpdir):
+    path = tmpdir.join("user.ydl")
+    path.write(USER)
+    registry = Registry()
+    assert registry.add_file(str(path)) == "user"
+    assert registry.add_file(str(path), "other") == "other"
+    assert registry.names() == ["other", "user"]
+
+
+def test_dump_and_attach(tmpdir):
+    registry = Registry()
+    registry.add("user", USER)
+    registry.add("tag", "str{1,}")
+    path = str(tmpdir.join("schemas.ydlr"))
+    registry.dump(path)
+    with Registry.attach(path) as attached:
+        assert attached.names() == ["tag", "user"]
+        assert "user" in attached and "role" not in attached
+        assert attached.schema("user") == registry.schema("user")
+        assert attached.schema("user") is attached.schema("user")
+        attached.validate("user", {"name": "foo", "roles": ["admin"]})
+        with pytest.raises(TypeError):
+            attached.add("role", "admin")
+        with pytest.raises(KeyError):
+            attached.schema("role")
+
+
+def test_attach_rejects_other_files(tmpdir):
+    path = tmpdir.join("schemas.ydlr")
+    path.write("not a registry")
+    with pytest.raises(ValueError):
+        Registry.attach(str(path))
+
+
+@pytest.mark.skipif(not hasattr(multiprocessing, "get_context"),
+                    reason="spawned workers need python 3")
+def test_attach_from_spawned_worker(tmpdir):
+    registry = Registry()
+    registry.add("user", USER)
+    path = str(tmpdir.join("schemas.ydlr"))
+    registry.dump(path)
+    pool = multiprocessing.get_context("spawn").Pool(1)
+    try:
+        assert pool.apply(_validate_in_worker, (
+            path, "user", {"name": "foo", "roles": ["admin"]})) == "ok"
+        assert pool.apply(_validate_in_worker, (
+            path, "user", {"name": "fo", "roles": []})) == \
+            "name: shorter than 3"
+    finally:
+        pool.close()
+        pool.join()
@@ -1,4 +1,5 @@
-from yaddle import loads
+from yaddle import loads, load_definitions, index_definitions
+import pytest
 
 
 def test_loads_enum():
@@ -327,3 +328,51 @@ shipping_address: @address
         "additionalProperties": False
     }
     assert loads(input) == expected
+
+
+LIBRARY = """
+@"http://example.com/library"
+@role: admin | author
+
+# users
+@user:
+    name: str
+
+    roles: [@role]
+@tag: str{1,}
+@broken: [
+@node:
+    children: [@node]
+title: str
+"""
+
+
+def test_index_definitions():
+    index = index_definitions(LIBRARY)
+    assert sorted(index) == ["broken", "node", "role", "tag", "user"]
+    assert index["user"] == "@user:\n    name: str\n\n    roles: [@role]\n"
+
+
+def test_load_definitions():
+    defs = load_definitions(LIBRARY, ["user"])
+    assert sorted(defs) == ["role", "user"]
+    assert defs["role"] == {"enum": ["admin", "author"]}
+    assert defs["user"] is defs["user"]
+    assert defs.schema("user") == {
+        "type": "object",
+        "properties": {"name": {"type": "string"},
+                       "roles": {"type": "array",
+                                 "items": {"$ref": "#/definitions/role"}}},
+        "required": ["name", "roles"],
+        "additionalProperties": False,
+        "definitions": {"role": {"enum": ["admin", "author"]}}}
+    assert defs.schema("role") == {"enum": ["admin", "author"]}
+
+    defs = load_definitions(LIBRARY, ["node", "tag"])
+    assert sorted(defs) == ["node", "tag"]
+    assert sorted(defs.schema("node")["definitions"]) == ["node"]
+
+    with pytest.raises(ValueError):
+        load_definitions(LIBRARY, ["missing"])
+    with pytest.raises(Exception):
+        load_definitions(LIBRARY, ["broken"])
@@ -0,0 +1,127 @@
+from yaddle.server import SchemaStore, ValidationServer, Metrics
+from yaddle import formats
+import json
+import threading
+import pytest
+
+try:
+    from http.client import HTTPConnection
+except ImportError:
+    from httplib import HTTPConnection
+
+
+@pytest.fixture
+def server(tmpdir):
+    tmpdir.join("user.ydl").write("name: str{3,}\nage?: int")
+    tmpdir.join("broken.yaddle").write("name: [")
+    tmpdir.join("notes.txt").write("ignored")
+    server = ValidationServer(("127.0.0.1", 0), SchemaStore(str(tmpdir)))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(conn, method, path, body=None):
+    if body is not None:
+        body = json.dumps(body)
+    conn.request(method, path, body)
+    response = conn.getresponse()
+    return (response.status, json.loads(response.read().decode("utf-8")))
+
+
+def test_validate(server):
+    conn = HTTPConnection(*server.server_address)
+    assert request(conn, "POST", "/validate/user", {"name": "foo"}) == \
+        (200, {"valid": True})
+    assert request(conn, "POST", "/validate/user", {"name": "fo"}) == \
+        (200, {"valid": False, "error": "shorter than 3", "path": ["name"]})
+    assert request(conn, "POST", "/validate/user?batch=1",
+                   [{"name": "foo"}, {"age": 1}]) == \
+        (200, {"results": [{"valid": True},
+                           {"valid": False, "error": "missing name",
+                            "path": []}]})
+    assert request(conn, "POST", "/validate/user?batch", {})[0] == 400
+    assert request(conn, "POST", "/validate/other", {})[0] == 404
+    conn.request("POST", "/validate/user", "{")
+    response = conn.getresponse()
+    assert response.status == 400
+    response.read()
+
+    (status, schemas) = request(conn, "GET", "/schemas")
+    assert schemas["schemas"] == ["user"]
+    assert list(schemas["errors"]) == ["broken.yaddle"]
+
+    (status, metrics) = request(conn, "GET", "/metrics")
+    assert metrics["requests"] == 6
+    assert metrics["documents"] == 4
+    assert metrics["invalid"] == 2
+    assert metrics["errors"] == 3
+    assert metrics["p50_ms"] <= metrics["p99_ms"]
+    conn.close()
+
+
+def test_bad_requests(tmpdir):
+    tmpdir.join("n.ydl").write("n: int{,,3}")
+    tmpdir.join("boom.ydl").write("%boom")
+    formats.register_format("boom", lambda value: 1 / 0)
+    server = ValidationServer(("127.0.0.1", 0), SchemaStore(str(tmpdir)))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        conn = HTTPConnection(*server.server_address)
+        assert request(conn, "POST", "/validate/n", {"n": 10 ** 400}) == \
+            (200, {"valid": False, "error": "not a multiple of 3.0",
+                   "path": ["n"]})
+        conn.request("POST", "/validate/n", "[" * 100000)
+        response = conn.getresponse()
+        assert response.status == 400
+        response.read()
+        (status, body) = request(conn, "POST", "/validate/boom", "x")
+        assert status == 500
+        assert body["error"].startswith("ZeroDivisionError")
+        conn.putrequest("POST", "/validate/n")
+        conn.putheader("Content-Length", "ten")
+        conn.endheaders()
+        response = conn.getresponse()
+        assert response.status == 400
+        response.read()
+        conn.close()
+        assert server.metrics.snapshot()["errors"] == 3
+    finally:
+        formats.unregister_format("boom")
+        server.shutdown()
+        server.server_close()
+
+
+def test_reload(tmpdir):
+    tmpdir.join("user.ydl").write("name: str")
+    store = SchemaStore(str(tmpdir))
+    registry = store.registry
+    assert not store.reload()
+    assert store.registry is registry
+
+    tmpdir.join("tag.ydl").write("str{1,}")
+    tmpdir.join("user.ydl").write("name: [")
+    assert store.reload()
+    assert store.registry.names() == ["tag", "user"]
+    assert list(store.errors) == ["user.ydl"]
+    store.registry.validate("user", {"name": "foo"})
+
+    tmpdir.join("tag.ydl").remove()
+    assert store.reload()
+    assert store.registry.names() == ["user"]
+
+
+def test_metrics():
+    metrics = Metrics(window=2)
+    assert metrics.snapshot()["p99_ms"] is None
+    for seconds in (0.003, 0.001, 0.002):
+        metrics.record(seconds, 1)
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == 3
+    assert snapshot["p50_ms"] == pytest.approx(2)
+    assert snapshot["p99_ms"] == pytest.approx(2)
@@ -0,0 +1,87 @@
+from yaddle import loads
+from yaddle.validator import compile_schema, is_valid, ValidationError
+import pytest
+
+
+def test_validate_primitives():
+    validate = compile_schema(loads("str{2,3}"))
+    assert validate("ab") == "ab"
+    for value in ["a", "abcd", 1, None]:
+        assert not is_valid(validate, value)
+
+    validate = compile_schema(loads("int{1,9,3}"))
+    assert is_valid(validate, 3)
+    assert is_valid(validate, 6.0)
+    for value in [0, 4, 12, 3.5, True, "3"]:
+        assert not is_valid(validate, value)
+
+    validate = compile_schema(loads("int{,,3}"))
+    assert is_valid(validate, 3 * 10 ** 400)
+    assert not is_valid(validate, 10 ** 400)
+
+    validate = compile_schema(loads("num{,,0.5}"))
+    assert is_valid(validate, 1.5)
+    assert not is_valid(validate, 1e308)
+    assert not is_valid(validate, 10 ** 400)
+
+    validate = compile_schema(loads("1 | true | a"))
+    assert is_valid(validate, 1)
+    assert is_valid(validate, True)
+    assert is_valid(validate, "a")
+    assert not is_valid(validate, "b")
+    assert not is_valid(validate, False)
+
+
+def test_validate_pattern_and_format():
+    validate = compile_schema(loads("/^[a-z]+$/"))
+    assert is_valid(validate, "abc")
+    assert not is_valid(validate, "ABC")
+
+    validate = compile_schema(loads("%ipv4 | %ipv6"))
+    assert is_valid(validate, "127.0.0.1")
+    assert is_valid(validate, "::1")
+    assert not is_valid(validate, "localhost")
+
+    validate = compile_schema(loads("%even"),
+                              formats={"even": lambda s: len(s) % 2 == 0})
+    assert is_valid(validate, "ab")
+    assert not is_valid(validate, "abc")
+
+    validate = compile_schema(loads("%unknown"))
+    assert is_valid(validate, "anything")
+
+
+def test_validate_array():
+    validate = compile_schema(loads("[str]{1,2}!"))
+    assert is_valid(validate, ["a", "b"])
+    for value in [[], ["a", "b", "c"], ["a", "a"], [1]]:
+        assert not is_valid(validate, value)
+
+    validate = compile_schema(loads("[str, int]"))
+    assert is_valid(validate, ["a", 1])
+    assert not is_valid(validate, [1, "a"])
+
+
+def test_validate_object():
+    validate = compile_schema(loads("""
+@role: admin | author
+
+user:
+    name: str{3,20}
+    roles: [@role]
+    description?: str{,200}
+"""))
+    assert is_valid(validate, {"user": {"name": "foo", "roles": ["admin"]}})
+    with pytest.raises(ValidationError) as e:
+        validate({"user": {"name": "foo", "roles": ["admin", "guest"]}})
+    assert e.value.path == ("user", "roles", 1)
+    assert str(e.value).startswith("user/roles/1: ")
+    with pytest.raises(ValidationError) as e:
+        validate({"user": {"roles": []}})
+    assert str(e.value) == "user: missing name"
+    with pytest.raises(ValidationError) as e:
+        validate({"user": {"name": "foo", "roles": [], "age": 1}})
+    assert str(e.value) == "user: unexpected age"
+
+    validate = compile_schema(loads("name: str\n..."))
+    assert is_valid(validate, {"name": "foo", "age": 1})
@@ -0,0 +1,343 @@
+"""generate python classes with ``__slots__`` from yaddle objects
+
+every object, nested or defined with ``@name:``, becomes a class whose
+``from_dict`` validates a document and builds the instance in the same
+pass::
+
+    python -m yaddle.codegen schema.ydl > models.py
+
+oneOf, anyOf, allOf and tuple arrays are validated with
+``yaddle.validator`` and kept as plain values
+"""
+
+import keyword
+import re
+import sys
+
+from .yaddle import parse, tokenize, generate_schema
+
+HEADER = '''# generated by yaddle.codegen, do not edit
+from numbers import Number as _Number
+
+from yaddle.formats import get_format as _get_format
+from yaddle.patterns import compile_pattern as _compile_pattern
+from yaddle.validator import (ValidationError, compile_schema as
+                              _compile_schema, freeze as _freeze,
+                              is_multiple as _is_multiple)
+
+try:
+    _basestring = basestring
+except NameError:
+    _basestring = str
+
+
+def _fail(message, path):
+    raise ValidationError(message, path)
+
+
+def _dump(value):
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return value
+
+'''
+
+
+def class_name(name):
+    return "".join(part[:1].upper() + part[1:]
+                   for part in name.replace("-", "_").split("_"))
+
+
+def num(value):
+    "literal for a parsed number, which is always a float"
+    return repr(int(value)) if value == int(value) else repr(value)
+
+
+def message(template, value):
+    "expression formatting value into a message containing literal text"
+    return "%r %% (%s,)" % (template.replace("%", "%%").replace(
+        "\0", "%r"), value)
+
+
+RESERVED = frozenset(["self", "cls", "from_dict", "to_dict"])
+
+
+def attr_name(name, taken=()):
+    """identifier for key name, suffixed with ``_`` while it is a keyword,
+    taken, or would clash with the parameters and methods of the class,
+    leading underscores are cut to one to keep clear of dunders and
+    name mangling
+    """
+    name = re.sub(r"[^A-Za-z0-9_]", "_", name)
+    if name[:1].isdigit() or name.startswith("__") or not name:
+        name = "_" + name.lstrip("_")
+    while keyword.iskeyword(name) or name in RESERVED or name in taken:
+        name += "_"
+    return name
+
+
+class _Generator(object):
+
+    def __init__(self, root):
+        self.root = root
+        self.constants = []
+        self.classes = []
+        self.definitions = {}
+        self.fallback_definitions = {}
+        self.class_names = {}
+        self.used = set(["ValidationError"])
+        self.counter = 0
+
+    def name(self, prefix):
+        self.counter += 1
+        return "%s%d" % (prefix, self.counter)
+
+    def unique(self, name):
+        "name, or name with a number if another class already has it"
+        (base, n) = (name, 1)
+        while name in self.used or keyword.iskeyword(name):
+            n += 1
+            name = "%s%d" % (base, n)
+        self.used.add(name)
+        return name
+
+    def constant(self, prefix, expr):
+        name = self.name(prefix)
+        self.constants.append("%s = %s" % (name, expr))
+        return name
+
+    def generate(self, node):
+        (tp, val) = node
+        if tp != "object":
+            raise ValueError("Expected an object, got %s" % tp)
+        definitions = val[3]
+        self.definitions = definitions
+        self.fallback_definitions = dict(
+            (k, generate_schema(v)) for (k, v) in definitions.items())
+        root = None
+        if val[0] or not definitions:
+            root = self.unique(self.root)
+        for (name, definition) in sorted(definitions.items()):
+            if definition[0] == "object":
+                self.class_names[name] = self.unique(class_name(name))
+        for (name, definition) in sorted(definitions.items()):
+            if definition[0] == "object":
+                self.object(self.class_names[name], definition[1])
+        if root is not None:
+            self.object(root, val)
+        out = [HEADER]
+        if self.fallback_definitions and any(
+                "_DEFINITIONS" in line for line in self.constants):
+            out.append("_DEFINITIONS = %r" % self.fallback_definitions)
+        out.extend(self.constants)
+        out.extend(self.classes)
+        return re.sub(r"\n{4,}", "\n\n\n", "\n".join(out))
+
+    def object(self, cls, val):
+        (kvs, required, sealed, _, _, _) = val
+        (fields, taken) = ([], set())
+        for (key, node) in kvs.items():
+            attr = attr_name(key, taken)
+            taken.add(attr)
+            fields.append((key, attr, node, key in required))
+        slots = tuple(attr for (_, attr, _, _) in fields)
+        lines = ["", "", "class %s(object):" % cls, "",
+                 "    __slots__ = %r" % (slots,)]
+        if sealed:
+            keys = self.constant("_keys", "frozenset(%r)" % list(kvs))
+
+        params = ["self"]
+        params += [attr for (_, attr, _, req) in fields if req]
+        params += ["%s=None" % attr for (_, attr, _, req) in fields
+                   if not req]
+        lines += ["", "    def __init__(%s):" % ", ".join(params)]
+        lines += ["        self.%s = %s" % (attr, attr)
+                  for (_, attr, _, _) in fields] or ["        pass"]
+
+        lines += ["", "    @classmethod",
+                  "    def from_dict(cls, data, path=()):",
+                  "        if not isinstance(data, dict):",
+                  "            _fail(\"expected object\", path)"]
+        if sealed:
+            lines += ["        if not %s.issuperset(data):" % keys,
+                      "            for key in data:",
+                      "                if key not in %s:" % keys,
+                      "                    _fail(\"unexpected %s\" % key, "
+                      "path)"]
+        lines += ["        self = cls.__new__(cls)"]
+        for (key, attr, node, req) in fields:
+            path = ("%r" % key,)
+            lines += ["        if %r in data:" % key,
+                      "            v = data[%r]" % key]
+            lines += self.check(node, "v", path, 3, cls + class_name(key))
+            lines += ["            self.%s = v" % attr, "        else:"]
+            if req:
+                lines += ["            _fail(%r, path)" % ("missing " + key)]
+            else:
+                lines += ["            self.%s = None" % attr]
+        lines += ["        return self"]
+
+        lines += ["", "    def to_dict(self):", "        data = {}"]
+        for (key, attr, _, req) in fields:
+            if req:
+                lines += ["        data[%r] = _dump(self.%s)" % (key, attr)]
+            else:
+                lines += ["        if self.%s is not None:" % attr,
+                          "            data[%r] = _dump(self.%s)"
+                          % (key, attr)]
+        lines += ["        return data"]
+
+        lines += ["", "    def __eq__(self, other):",
+                  "        return type(self) is type(other) and "
+                  "self.to_dict() == other.to_dict()",
+                  "", "    def __ne__(self, other):",
+                  "        return not self == other",
+                  "", "    def __repr__(self):",
+                  "        return \"%s(%%r)\" %% self.to_dict()" % cls]
+        self.classes.append("\n".join(lines))
+
+    def check(self, node, var, path, depth, owner, seen=()):
+        """lines checking var against node at the given indentation depth,
+        leaving the constructed value in var
+
+        path is a tuple of expressions for the keys below ``path``
+        """
+        (tp, val) = node
+        pad = "    " * depth
+        at = "path + (%s%s)" % (", ".join(path), "," if len(path) == 1 else "")
+        fail = lambda cond, msg: [pad + "if %s:" % cond,
+                                  pad + "    _fail(%s, %s)" % (msg, at)]
+        if tp == "string":
+            (nrange, pattern) = val
+            lines = fail("not isinstance(%s, _basestring)" % var,
+                         '"expected string"')
+            if nrange is not None:
+                (lo, hi) = nrange
+                if lo is not None:
+                    lines += fail("len(%s) < %s" % (var, num(lo)),
+                                  '"shorter than %d"' % lo)
+                if hi is not None:
+                    lines += fail("len(%s) > %s" % (var, num(hi)),
+                                  '"longer than %d"' % hi)
+            if pattern is not None:
+                search = self.constant(
+                    "_search", "_compile_pattern(%r).search" % pattern)
+                lines += fail("not %s(%s)" % (search, var),
+                              message("\0 does not match /%s/" % pattern,
+                                      var))
+            return lines
+        elif tp == "number" or tp == "integer":
+            cond = "not isinstance(%s, _Number) or isinstance(%s, bool)" \
+                % (var, var)
+            if tp == "integer":
+                cond += " or isinstance(%s, float) and not %s.is_integer()" \
+                    % (var, var)
+            lines = fail(cond, '"expected %s"' % tp)
+            if val is not None:
+                (lo, hi, step) = val
+                if lo is not None:
+                    lines += fail("%s < %s" % (var, num(lo)),
+                                  '"less than %s"' % lo)
+                if hi is not None:
+                    lines += fail("%s > %s" % (var, num(hi)),
+                                  '"greater than %s"' % hi)
+                if step is not None:
+                    lines += fail(
+                        "not _is_multiple(%s, %s)" % (var, num(step)),
+                        '"not a multiple of %s"' % step)
+            return lines
+        elif tp == "boolean":
+            return fail("%s is not True and %s is not False" % (var, var),
+                        '"expected boolean"')
+        elif tp == "null":
+            return fail("%s is not None" % var, '"expected null"')
+        elif tp == "enum":
+            allowed = self.constant(
+                "_enum", "frozenset(map(_freeze, %r))" % (val,))
+            return fail("_freeze(%s) not in %s" % (var, allowed),
+                        message("\0 not in %r" % (val,), var))
+        elif tp == "format":
+            checker = self.constant("_format", "_get_format(%r)" % val)
+            return fail("%s is not None and isinstance(%s, _basestring) "
+                        "and not %s(%s)" % (checker, var, checker, var),
+                        message("\0 is not a valid %s" % val, var))
+        elif tp == "ref" and val in self.definitions and val not in seen:
+            definition = self.definitions[val]
+            if definition[0] == "object":
+                return [pad + "%s = %s.from_dict(%s, %s)"
+                        % (var, self.class_names[val], var, at)]
+            return self.check(definition, var, path, depth, owner,
+                              seen + (val,))
+        elif tp == "object":
+            cls = self.unique(owner)
+            self.object(cls, val)
+            return [pad + "%s = %s.from_dict(%s, %s)"
+                    % (var, cls, var, at)]
+        elif tp == "array" and len(val[0]) < 2:
+            (items, size_range, unique) = val
+            lines = fail("not isinstance(%s, list)" % var, '"expected array"')
+            if size_range:
+                (lo, hi) = size_range
+                if lo is not None:
+                    lines += fail("len(%s) < %s" % (var, num(lo)),
+                                  '"fewer than %d items"' % lo)
+                if hi is not None:
+                    lines += fail("len(%s) > %s" % (var, num(hi)),
+                                  '"more than %d items"' % hi)
+            if unique:
+                lines += fail("len(set(map(_freeze, %s))) != len(%s)"
+                              % (var, var), '"items are not unique"')
+            if items:
+                (index, item, out) = (self.name("i"), self.name("v"),
+                                      self.name("items"))
+                lines += [pad + "%s = []" % out,
+                          pad + "for (%s, %s) in enumerate(%s):"
+                          % (index, item, var)]
+                lines += self.check(items[0], item, path + (index,),
+                                    depth + 1, owner + "Item", seen)
+                lines += [pad + "    %s.append(%s)" % (out, item),
+                          pad + "%s = %s" % (var, out)]
+            return lines
+        schema = generate_schema(node)
+        if self.fallback_definitions:
+            schema = "dict(%r, definitions=_DEFINITIONS)" % schema
+        validate = self.constant("_validate", "_compile_schema(%s)" % schema)
+        return [pad + "%s(%s, %s)" % (validate, var, at)]
+
+
+def generate_code(source, root="Root"):
+    """python source with a class for every object in the yaddle source
+
+    definitions are named after their key, the top level object is named
+    root, and nested objects after their parent and key, a name already
+    taken by another class gets a number
+    """
+    return _Generator(root).generate(parse(tokenize(source)))
+
+
+def load_classes(source, root="Root"):
+    "generate and execute the classes, return them in a dict by name"
+    namespace = {"__name__": "yaddle.generated"}
+    code = generate_code(source, root)
+    exec(compile(code, "<yaddle.codegen>", "exec"), namespace)
+    return dict((k, v) for (k, v) in namespace.items()
+                if isinstance(v, type) and v.__module__ == "yaddle.generated"
+                and hasattr(v, "from_dict"))
+
+
+def main():
+    if len(sys.argv) > 2:
+        raise SystemExit(sys.argv[0] + " [infile]")
+    infile = open(sys.argv[1]) if len(sys.argv) == 2 else sys.stdin
+    with infile:
+        try:
+            code = generate_code(infile.read())
+        except ValueError as e:
+            raise SystemExit(e)
+    sys.stdout.write(code + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""differential testing of tokenizer and parser backends
+
+a backend is a ``tokenize`` and ``parse`` pair, the one in
+``yaddle.yaddle`` is the reference. Random sources, valid ones from a
+generator that follows the grammar and invalid ones mutated from them, go
+through every backend, which must give the same ast, the same schema and
+errors of the same type and message as the reference, and must not be
+slower than ``budget`` times the reference
+
+    python -m yaddle.difftest -n 2000 --seed 1 --budget 1.2
+
+register a new backend before running::
+
+    from yaddle import difftest
+    difftest.register_backend("fast", fast.tokenize, fast.parse)
+"""
+
+import argparse
+import random
+import timeit
+
+from .yaddle import tokenize, parse, generate_schema
+
+REFERENCE = "reference"
+
+_backends = {REFERENCE: (tokenize, parse)}
+
+
+def register_backend(name, tokenize, parse):
+    _backends[name] = (tokenize, parse)
+
+
+def unregister_backend(name):
+    if name != REFERENCE:
+        _backends.pop(name, None)
+
+
+def backends():
+    return sorted(_backends)
+
+
+NAMES = ["a", "b", "id", "name", "x-y", "_z", "item2", "str", "true"]
+FORMATS = ["email", "date-time", "hostname", "ipv4", "ipv6", "uri"]
+PATTERNS = ["^[a-z]+$", "[?{}]", "\\d{2,}", "^(/[^/]+)+$", "a|b"]
+NUMBERS = ["0", "1", "-1", "42", "3.14", "-0.5", "100"]
+STRINGS = ['"with space"', '"quo\\"te"', '"0.1"', '"null"', '""']
+MUTATIONS = list("{}[]:|@%!/&?,.#\"") + ["\t", "\n", "  ", "...", "@"]
+
+
+class SourceGenerator(object):
+    "random yaddle sources following the grammar"
+
+    def __init__(self, rng, max_depth=3, indent="    "):
+        self.rng = rng
+        self.max_depth = max_depth
+        self.indent = indent
+        self.definitions = []
+        self.slash = True
+
+    def choice(self, items):
+        return self.rng.choice(items)
+
+    def maybe(self, text, p=0.5):
+        return text if self.rng.random() < p else ""
+
+    def number(self):
+        return self.choice(NUMBERS)
+
+    def range(self, step=False):
+        parts = [self.maybe(self.number()), self.maybe(self.number())]
+        if step and self.rng.random() < 0.3:
+            parts.append(self.choice(["1", "0.5", "3"]))
+        return "{%s}" % ",".join(parts)
+
+    def pattern(self):
+        """the REGEXP token is greedy, a second ``/`` on the same line would
+        end up in the pattern, so a line gets one pattern at most
+        """
+        self.slash = False
+        return "/%s/" % self.choice(PATTERNS)
+
+    def newline(self):
+        self.slash = True
+
+    def base(self, depth, slash=True):
+        "without slash no pattern, for the ``/`` of anyOf, is generated"
+        kinds = ["str", "num", "int", "bool", "null", "format", "ref"]
+        if slash:
+            kinds += ["regexp", "array"]
+        kind = self.choice(kinds)
+        if kind == "regexp" and not self.slash:
+            kind = "str"
+        if kind == "str":
+            text = "str" + self.maybe(self.range())
+            if slash and self.slash and self.rng.random() < 0.2:
+                text += " " + self.pattern()
+            return text
+        elif kind == "regexp":
+            return self.maybe(self.range()) + self.pattern()
+        elif kind in ("num", "int"):
+            return kind + self.maybe(self.range(step=True))
+        elif kind == "format":
+            return "%" + self.choice(FORMATS)
+        elif kind == "ref":
+            return "@" + self.choice(self.definitions or NAMES)
+        elif kind == "array" and depth < self.max_depth:
+            items = [self.simple(depth + 1)
+                     for _ in range(self.rng.randint(0, 2))]
+            return "[%s]%s%s" % (", ".join(items),
+                                 self.maybe(self.range(), 0.3),
+                                 self.maybe("!", 0.2))
+        return self.choice(["bool", "null"])
+
+    def enum(self):
+        "the first item can't be a keyword, it would parse as a schema"
+        items = [self.choice(NAMES + NUMBERS + STRINGS +
+                             ["true", "false", "null"])
+                 for _ in range(self.rng.randint(1, 4))]
+        if items[0] in ("str", "null"):
+            items[0] = self.choice(STRINGS)
+        return " | ".join(items)
+
+    def simple(self, depth=0, line=False):
+        "anyOf only on its own line, see pattern"
+        if line:
+            self.newline()
+        kind = self.rng.random()
+        if kind < 0.15:
+            return self.enum()
+        elif kind < 0.25 and line:
+            return " / ".join(self.base(depth, slash=False)
+                              for _ in range(2))
+        elif kind < 0.35:
+            op = self.choice([" | ", " & "])
+            return op.join(self.base(depth)
+                           for _ in range(self.rng.randint(2, 3)))
+        return self.base(depth)
+
+    def key(self):
+        return self.choice(NAMES) + self.maybe("?", 0.3)
+
+    def object(self, depth):
+        "lines of an object, unindented"
+        lines = []
+        for _ in range(self.rng.randint(1, 4)):
+            if depth < self.max_depth and self.rng.random() < 0.2:
+                lines.append(self.key() + ":")
+                lines.extend(self.indent + line
+                             for line in self.object(depth + 1))
+            else:
+                lines.append("%s: %s%s" % (
+                    self.key(), self.simple(depth, line=True),
+                    self.maybe("  # note", 0.1)))
+        if self.rng.random() < 0.1:
+            lines.append("...")
+        return lines
+
+    def source(self):
+        self.definitions = []
+        if self.rng.random() < 0.2:
+            return self.simple(line=True)
+        lines = []
+        if self.rng.random() < 0.1:
+            lines.append('@"http://example.com/schema"')
+        if self.rng.random() < 0.1:
+            lines.append('@remote "http://example.com/remote"')
+        for _ in range(self.rng.randint(0, 3)):
+            name = self.choice(NAMES)
+            self.definitions.append(name)
+            if self.rng.random() < 0.5:
+                lines.append("@%s: %s" % (name, self.simple(line=True)))
+            else:
+                lines.append("@%s:" % name)
+                lines.extend(self.indent + line for line in self.object(1))
+            lines.extend(self.maybe("\n", 0.3).split("\n")[1:])
+        lines.extend(self.object(0))
+        return self.maybe("\n", 0.2) + "\n".join(lines) + self.maybe("\n")
+
+    def mutate(self, source):
+        "source with a random insertion, deletion or indentation error"
+        kind = self.rng.random()
+        at = self.rng.randint(0, len(source))
+        if kind < 0.4 and source:
+            at = min(at, len(source) - 1)
+            return source[:at] + source[at + 1:]
+        elif kind < 0.8:
+            return source[:at] + self.choice(MUTATIONS) + source[at:]
+        lines = source.split("\n")
+        at = self.rng.randint(0, len(lines) - 1)
+        lines[at] = self.choice([" ", "\t", self.indent * 2]) + lines[at]
+        return "\n".join(lines)
+
+
+def outcome(backend, source):
+    """what a backend makes of source, ("ok", ast, schema) or
+    ("error", exception type, message), and the seconds it took to
+    tokenize and parse
+    """
+    (tokenize_, parse_) = backend
+    started = timeit.default_timer()
+    try:
+        ast = parse_(list(tokenize_(source)))
+    except Exception as e:
+        elapsed = timeit.default_timer() - started
+        return (("error", type(e).__name__, str(e)), elapsed)
+    elapsed = timeit.default_timer() - started
+    try:
+        return (("ok", ast, generate_schema(ast)), elapsed)
+    except Exception as e:
+        return (("error", type(e).__name__, str(e)), elapsed)
+
+
+class Report(object):
+
+    def __init__(self):
+        self.sources = 0
+        self.errors = 0
+        self.timings = dict((name, 0.0) for name in _backends)
+        self.mismatches = []
+
+    def ratios(self):
+        "time of every backend relative to the reference"
+        reference = self.timings[REFERENCE] or 1e-9
+        return dict((name, timing / reference)
+                    for (name, timing) in self.timings.items())
+
+    def failures(self, budget=None):
+        failures = ["%s differs on %r: %r != %r" % mismatch
+                    for mismatch in self.mismatches]
+        if budget is not None:
+            for (name, ratio) in sorted(self.ratios().items()):
+                if ratio > budget:
+                    failures.append("%s takes %.2fx the reference, budget "
+                                    "is %.2fx" % (name, ratio, budget))
+        return failures
+
+    def check(self, budget=None):
+        failures = self.failures(budget)
+        if failures:
+            raise AssertionError("\n".join(failures))
+        return self
+
+    def summary(self):
+        lines = ["%d sources, %d rejected by the reference"
+                 % (self.sources, self.errors)]
+        ratios = self.ratios()
+        for name in sorted(self.timings):
+            lines.append("%-12s %8.3fs %6.2fx" % (
+                name, self.timings[name], ratios[name]))
+        return "\n".join(lines)
+
+
+def run(count=1000, seed=None, invalid=0.3):
+    """feed count random sources through every backend, a fraction of
+    them mutated into likely invalid ones, and report the differences
+    """
+    rng = random.Random(seed)
+    # backends run in a random order, drawn apart from the sources so the
+    # sources of a seed don't depend on which backends are registered
+    order = random.Random(seed)
+    generator = SourceGenerator(rng)
+    report = Report()
+    names = backends()
+    for _ in range(count):
+        source = generator.source()
+        if rng.random() < invalid:
+            source = generator.mutate(source)
+        report.sources += 1
+        results = {}
+        for name in order.sample(names, len(names)):
+            (results[name], elapsed) = outcome(_backends[name], source)
+            report.timings[name] += elapsed
+        expected = results[REFERENCE]
+        report.errors += expected[0] == "error"
+        for name in names:
+            if results[name] != expected:
+                report.mismatches.append(
+                    (name, source, results[name], expected))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m yaddle.difftest")
+    parser.add_argument("-n", "--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--invalid", type=float, default=0.3,
+                        help="fraction of sources mutated to be invalid")
+    parser.add_argument("--budget", type=float,
+                        help="fail if a backend is slower than this many "
+                             "times the reference")
+    args = parser.parse_args(argv)
+    report = run(args.count, args.seed, args.invalid)
+    print(report.summary())
+    failures = report.failures(args.budget)
+    if failures:
+        raise SystemExit("\n".join(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""checkers for the ``%format`` rule
+
+every checker takes a string and returns True or False, built-in ones
+scan their input once without regular expressions, so hostile input
+can't make them backtrack
+"""
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+_checkers = {}
+
+
+def register_format(name, checker):
+    "register a checker for ``%name``, replacing any existing one"
+    _checkers[name] = checker
+    return checker
+
+
+def unregister_format(name):
+    _checkers.pop(name, None)
+
+
+def get_format(name):
+    "return the checker for ``name``, or None for unknown formats"
+    return _checkers.get(name)
+
+
+def check_format(name, value):
+    "unknown formats and non-string values always pass"
+    checker = _checkers.get(name)
+    if checker is None or not isinstance(value, basestring):
+        return True
+    return checker(value)
+
+
+def formats():
+    return sorted(_checkers)
+
+
+DIGITS = frozenset("0123456789")
+HEXDIGITS = frozenset("0123456789abcdefABCDEF")
+ALPHA = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+ALNUM = ALPHA | DIGITS
+LABEL_CHARS = ALNUM | frozenset("-")
+LOCAL_CHARS = ALNUM | frozenset("!#$%&'*+-/=?^_`{|}~.")
+SCHEME_CHARS = ALNUM | frozenset("+-.")
+
+
+def _digits(s, start, count):
+    "parse exactly count digits at start, return the int or None"
+    end = start + count
+    if end > len(s):
+        return None
+    n = 0
+    for i in range(start, end):
+        c = s[i]
+        if c not in DIGITS:
+            return None
+        n = n * 10 + ord(c) - 48
+    return n
+
+
+def _days_in_month(year, month):
+    if month == 2:
+        leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        return 29 if leap else 28
+    return 30 if month in (4, 6, 9, 11) else 31
+
+
+def is_date(s):
+    "full-date from RFC 3339, YYYY-MM-DD"
+    if len(s) != 10 or s[4] != "-" or s[7] != "-":
+        return False
+    year = _digits(s, 0, 4)
+    month = _digits(s, 5, 2)
+    day = _digits(s, 8, 2)
+    if year is None or month is None or day is None:
+        return False
+    return 1 <= month <= 12 and 1 <= day <= _days_in_month(year, month)
+
+
+def _is_time(s, start):
+    "partial-time and time-offset from RFC 3339, starting at start"
+    if len(s) < start + 9 or s[start + 2] != ":" or s[start + 5] != ":":
+        return False
+    hour = _digits(s, start, 2)
+    minute = _digits(s, start + 3, 2)
+    second = _digits(s, start + 6, 2)
+    if hour is None or minute is None or second is None:
+        return False
+    if hour > 23 or minute > 59 or second > 60:
+        return False
+    i = start + 8
+    if s[i] == ".":
+        i += 1
+        frac = i
+        while i < len(s) and s[i] in DIGITS:
+            i += 1
+        if i == frac or i == len(s):
+            return False
+    if s[i] in "zZ":
+        return i + 1 == len(s)
+    if s[i] in "+-":
+        if len(s) != i + 6 or s[i + 3] != ":":
+            return False
+        oh = _digits(s, i + 1, 2)
+        om = _digits(s, i + 4, 2)
+        return oh is not None and om is not None and oh <= 23 and om <= 59
+    return False
+
+
+def is_date_time(s):
+    "date-time from RFC 3339"
+    if len(s) < 20 or s[10] not in "tT ":
+        return False
+    return is_date(s[:10]) and _is_time(s, 11)
+
+
+def is_hostname(s):
+    "hostname from RFC 1123"
+    if not s or len(s) > 253:
+        return False
+    if s[-1] == ".":
+        s = s[:-1]
+    for label in s.split("."):
+        if not label or len(label) > 63:
+            return False
+        if label[0] == "-" or label[-1] == "-":
+            return False
+        for c in label:
+            if c not in LABEL_CHARS:
+                return False
+    return True
+
+
+def is_email(s):
+    "addr-spec from RFC 5322, without quoted local parts or comments"
+    at = s.rfind("@")
+    if at < 1 or at > 64:
+        return False
+    local = s[:at]
+    if local[0] == "." or local[-1] == ".":
+        return False
+    prev = None
+    for c in local:
+        if c not in LOCAL_CHARS or (c == "." and prev == "."):
+            return False
+        prev = c
+    return is_hostname(s[at + 1:])
+
+
+def is_ipv4(s):
+    "dotted quad"
+    parts = s.split(".")
+    if len(parts) != 4:
+        return False
+    for part in parts:
+        if not part or len(part) > 3:
+            return False
+        if len(part) > 1 and part[0] == "0":
+            return False
+        n = _digits(part, 0, len(part))
+        if n is None or n > 255:
+            return False
+    return True
+
+
+def _hex_groups(s):
+    "count the 1-4 digit hex groups in s, or return None"
+    if not s:
+        return 0
+    groups = s.split(":")
+    for group in groups:
+        if not group or len(group) > 4:
+            return None
+        for c in group:
+            if c not in HEXDIGITS:
+                return None
+    return len(groups)
+
+
+def is_ipv6(s):
+    "RFC 4291 text form, including an embedded ipv4 tail"
+    if len(s) > 45:
+        return False
+    tail = 0
+    last = s.rfind(":")
+    if last >= 0 and "." in s[last + 1:]:
+        if not is_ipv4(s[last + 1:]):
+            return False
+        s = s[:last + 1] if s[last - 1:last + 1] == "::" else s[:last]
+        tail = 2
+    halves = s.split("::")
+    if len(halves) > 2:
+        return False
+    if len(halves) == 1:
+        n = _hex_groups(s)
+        return n is not None and n + tail == 8
+    head = _hex_groups(halves[0])
+    rest = _hex_groups(halves[1])
+    if head is None or rest is None:
+        return False
+    return head + rest + tail <= 7
+
+
+def is_uri(s):
+    "absolute URI from RFC 3986, checked for scheme and legal characters"
+    colon = s.find(":")
+    if colon < 1 or s[0] not in ALPHA:
+        return False
+    for c in s[:colon]:
+        if c not in SCHEME_CHARS:
+            return False
+    i = colon + 1
+    n = len(s)
+    while i < n:
+        c = s[i]
+        if c <= " " or c in '"<>\\^`{|}' or c == "\x7f":
+            return False
+        if c == "%":
+            if i + 2 >= n or s[i + 1] not in HEXDIGITS \
+                    or s[i + 2] not in HEXDIGITS:
+                return False
+            i += 2
+        i += 1
+    return True
+
+
+register_format("date", is_date)
+register_format("date-time", is_date_time)
+register_format("email", is_email)
+register_format("hostname", is_hostname)
+register_format("host-name", is_hostname)
+register_format("ipv4", is_ipv4)
+register_format("ipv6", is_ipv6)
+register_format("uri", is_uri)
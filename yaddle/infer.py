@@ -0,0 +1,410 @@
+"""infer yaddle source from json samples
+
+    python -m yaddle.infer [options] sample.ndjson ... > schema.ydl
+
+samples are read one line at a time, only their merged shape is kept in
+memory, which is bounded by ``--enum-limit`` and ``--key-limit``. With
+``--jobs`` files are split into byte ranges inferred in parallel, with
+``--state`` the merged shape is written as json instead, state files from
+several machines can be combined with ``--merge``
+
+strings with at most ``--enum-limit`` distinct values, each seen twice on
+average, become enums, keys missing from some samples become ``key?``,
+objects that appear in arrays or next to other types become definitions
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+from numbers import Integral
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+ENUM_LIMIT = 10
+KEY_LIMIT = 1000
+
+NAME = re.compile(r"^[A-Za-z_][A-Za-z_0-9-]*$")
+KEYWORDS = frozenset(["str", "num", "int", "bool", "null", "true", "false"])
+
+
+def _extend(bounds, lo, hi):
+    if bounds is None:
+        return [lo, hi]
+    return [min(bounds[0], lo), max(bounds[1], hi)]
+
+
+class Shape(object):
+    "what has been observed at one position of the samples"
+
+    def __init__(self, enum_limit=ENUM_LIMIT, key_limit=KEY_LIMIT):
+        self.enum_limit = enum_limit
+        self.key_limit = key_limit
+        self.count = 0
+        self.nulls = 0
+        self.booleans = 0
+        self.integers = None
+        self.numbers = None
+        self.strings = 0
+        self.lengths = None
+        self.values = set()
+        self.arrays = 0
+        self.sizes = None
+        self.items = None
+        self.objects = 0
+        self.keys = {}
+        self.open = False
+
+    def child(self):
+        return Shape(self.enum_limit, self.key_limit)
+
+    def observe(self, value):
+        self.count += 1
+        if value is None:
+            self.nulls += 1
+        elif isinstance(value, bool):
+            self.booleans += 1
+        elif isinstance(value, Integral):
+            self.integers = _extend(self.integers, value, value)
+        elif isinstance(value, float):
+            self.numbers = _extend(self.numbers, value, value)
+        elif isinstance(value, basestring):
+            self.strings += 1
+            self.lengths = _extend(self.lengths, len(value), len(value))
+            if self.values is not None:
+                self.values.add(value)
+                if len(self.values) > self.enum_limit:
+                    self.values = None
+        elif isinstance(value, (list, tuple)):
+            self.arrays += 1
+            self.sizes = _extend(self.sizes, len(value), len(value))
+            if self.items is None:
+                self.items = self.child()
+            for item in value:
+                self.items.observe(item)
+        elif isinstance(value, dict):
+            self.objects += 1
+            if self.keys is None:
+                return
+            for (key, item) in value.items():
+                shape = self.keys.get(key)
+                if shape is None:
+                    shape = self.keys[key] = self.child()
+                shape.observe(item)
+            self._limit_keys()
+        else:
+            raise TypeError("Not a json value: %r" % (value,))
+
+    def _limit_keys(self):
+        if len(self.keys) > self.key_limit:
+            self.keys = None
+            self.open = True
+
+    def merge(self, other):
+        "fold the observations of other into this shape"
+        self.count += other.count
+        self.nulls += other.nulls
+        self.booleans += other.booleans
+        for attr in ("integers", "numbers", "lengths", "sizes"):
+            theirs = getattr(other, attr)
+            if theirs is not None:
+                setattr(self, attr, _extend(getattr(self, attr), *theirs))
+        self.strings += other.strings
+        if self.values is not None:
+            if other.values is None:
+                self.values = None
+            else:
+                self.values.update(other.values)
+                if len(self.values) > self.enum_limit:
+                    self.values = None
+        self.arrays += other.arrays
+        if other.items is not None:
+            if self.items is None:
+                self.items = self.child()
+            self.items.merge(other.items)
+        self.objects += other.objects
+        self.open = self.open or other.open
+        if other.keys is None:
+            self.keys = None
+        elif self.keys is not None:
+            for (key, theirs) in other.keys.items():
+                if key not in self.keys:
+                    self.keys[key] = self.child()
+                self.keys[key].merge(theirs)
+            self._limit_keys()
+        return self
+
+    def to_state(self):
+        "plain json for this shape, to be merged elsewhere"
+        return {
+            "count": self.count, "nulls": self.nulls,
+            "booleans": self.booleans, "integers": self.integers,
+            "numbers": self.numbers, "strings": self.strings,
+            "lengths": self.lengths,
+            "values": None if self.values is None else sorted(self.values),
+            "arrays": self.arrays, "sizes": self.sizes,
+            "items": self.items and self.items.to_state(),
+            "objects": self.objects, "open": self.open,
+            "keys": None if self.keys is None else [
+                [k, v.to_state()] for (k, v) in self.keys.items()],
+        }
+
+    @classmethod
+    def from_state(cls, state, enum_limit=ENUM_LIMIT, key_limit=KEY_LIMIT):
+        shape = cls(enum_limit, key_limit)
+        for attr in ("count", "nulls", "booleans", "integers", "numbers",
+                     "strings", "lengths", "arrays", "sizes", "objects",
+                     "open"):
+            setattr(shape, attr, state[attr])
+        if state["values"] is None or len(state["values"]) > enum_limit:
+            shape.values = None
+        else:
+            shape.values = set(state["values"])
+        if state["items"] is not None:
+            shape.items = cls.from_state(state["items"], enum_limit,
+                                         key_limit)
+        if state["keys"] is None:
+            shape.keys = None
+        else:
+            for (key, sub) in state["keys"]:
+                shape.keys[key] = cls.from_state(sub, enum_limit, key_limit)
+            shape._limit_keys()
+        return shape
+
+
+def _number(n, up=False):
+    """yaddle literal for a bound, or an empty string if it has none
+
+    yaddle parses numbers as floats, an integer a float can't hold is
+    rounded outward, up for an upper bound, to the nearest one it can
+    """
+    if isinstance(n, float):
+        if n != n or n in (float("inf"), float("-inf")):
+            return ""
+        if n.is_integer() and abs(n) < 1e15:
+            return str(int(n))
+        text = repr(n)
+        return "" if "e" in text or "E" in text else text
+    ulp = 2 ** max(0, abs(n).bit_length() - 53)
+    return str(n + (-n % ulp if up else -(n % ulp)))
+
+
+def _range(bounds):
+    (lo, hi) = (_number(bounds[0]), _number(bounds[1], up=True))
+    return "{%s,%s}" % (lo, hi) if lo or hi else ""
+
+
+def _enum_item(value):
+    if NAME.match(value) and value not in KEYWORDS:
+        return value
+    if '"' in value or "\\" in value or "\n" in value or "\r" in value:
+        return None
+    return '"%s"' % value
+
+
+class _Emitter(object):
+
+    def __init__(self):
+        self.definitions = []
+        self.names = set()
+
+    def define(self, shape, hint):
+        name = re.sub(r"[^A-Za-z_0-9-]", "_", hint)
+        if not NAME.match(name):
+            name = "_" + name
+        (base, n) = (name, 1)
+        while name in self.names:
+            n += 1
+            name = "%s%d" % (base, n)
+        self.names.add(name)
+        lines = ["    " + line for line in self.body(shape, name)]
+        self.definitions.append(["@%s:" % name] + lines)
+        return name
+
+    def body(self, shape, hint):
+        "lines of an object"
+        lines = []
+        is_open = shape.open
+        for (key, sub) in (shape.keys or {}).items():
+            if not NAME.match(key):
+                is_open = True
+                continue
+            optional = "?" if sub.count < shape.objects else ""
+            if sub.objects and sub.objects == sub.count:
+                lines.append("%s%s:" % (key, optional))
+                lines.extend("    " + line
+                             for line in self.body(sub, key))
+            else:
+                lines.append("%s%s: %s" % (key, optional,
+                                           self.inline(sub, key)))
+        if is_open or not lines:
+            lines.append("...")
+        return lines
+
+    def enum(self, shape):
+        if shape.values is None or shape.strings < 2 * len(shape.values):
+            return None
+        items = [_enum_item(value) for value in sorted(shape.values)]
+        if None in items:
+            return None
+        return items
+
+    def inline(self, shape, hint):
+        "a simple schema for shape, objects are moved to definitions"
+        alternatives = []
+        enum = self.enum(shape) if shape.strings else None
+        if enum and shape.strings + shape.nulls == shape.count:
+            return " | ".join(enum + ["null"] * bool(shape.nulls))
+        if shape.objects:
+            alternatives.append("@" + self.define(shape, hint))
+        if shape.arrays:
+            items = ""
+            if shape.items is not None and shape.items.count:
+                items = self.inline(shape.items, hint + "_item")
+            alternatives.append("[%s]%s" % (items, _range(shape.sizes)))
+        if shape.strings:
+            alternatives.append("str" + _range(shape.lengths))
+        if shape.numbers:
+            bounds = shape.numbers
+            if shape.integers:
+                bounds = _extend(bounds, *shape.integers)
+            alternatives.append("num" + _range(bounds))
+        elif shape.integers:
+            alternatives.append("int" + _range(shape.integers))
+        if shape.booleans:
+            alternatives.append("bool")
+        if shape.nulls:
+            alternatives.append("null")
+        return " | ".join(alternatives)
+
+
+def to_yaddle(shape):
+    "yaddle source describing every sample observed by shape"
+    if not shape.count:
+        raise ValueError("No samples")
+    emitter = _Emitter()
+    if shape.objects and shape.objects == shape.count:
+        lines = emitter.body(shape, "root")
+    else:
+        lines = [emitter.inline(shape, "root")]
+        if emitter.definitions:
+            raise ValueError("Only objects can hold definitions, "
+                             "samples mixing objects with other values "
+                             "or arrays of objects are not supported")
+    out = []
+    for definition in emitter.definitions:
+        out.extend(definition)
+    return "\n".join(out + lines) + "\n"
+
+
+def infer(samples, enum_limit=ENUM_LIMIT, key_limit=KEY_LIMIT):
+    "shape of an iterable of json values"
+    shape = Shape(enum_limit, key_limit)
+    for sample in samples:
+        shape.observe(sample)
+    return shape
+
+
+def infer_lines(path, start=0, end=None, enum_limit=ENUM_LIMIT,
+                key_limit=KEY_LIMIT):
+    """shape of the ndjson lines of path starting between the byte offsets
+    start and end, shards of one file can be inferred in separate processes
+    """
+    shape = Shape(enum_limit, key_limit)
+    with open(path, "rb") as fp:
+        if start:
+            fp.seek(start - 1)
+            fp.readline()
+        position = fp.tell()
+        while end is None or position < end:
+            line = fp.readline()
+            if not line:
+                break
+            if line.strip():
+                try:
+                    sample = json.loads(line.decode("utf-8"))
+                except ValueError as e:
+                    raise ValueError("Bad json at byte %d of %s: %s"
+                                     % (position, path, e))
+                shape.observe(sample)
+            position += len(line)
+    return shape
+
+
+def _infer_shard(args):
+    return infer_lines(*args).to_state()
+
+
+def shards(paths, jobs):
+    "split every file into jobs byte ranges"
+    for path in paths:
+        size = os.path.getsize(path)
+        step = size // jobs + 1
+        for start in range(0, size or 1, step):
+            yield (path, start, start + step)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m yaddle.infer",
+        description="infer yaddle source from ndjson samples")
+    parser.add_argument("files", nargs="*",
+                        help="ndjson files, stdin if omitted")
+    parser.add_argument("--json", action="store_true",
+                        help="each file holds one json array of samples")
+    parser.add_argument("--merge", action="store_true",
+                        help="files are states written with --state")
+    parser.add_argument("--state", metavar="FILE",
+                        help="write the merged state instead of source")
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("--enum-limit", type=int, default=ENUM_LIMIT)
+    parser.add_argument("--key-limit", type=int, default=KEY_LIMIT)
+    args = parser.parse_args(argv)
+    limits = (args.enum_limit, args.key_limit)
+
+    shape = Shape(*limits)
+    try:
+        if args.merge:
+            for path in args.files:
+                with open(path) as fp:
+                    shape.merge(Shape.from_state(json.load(fp), *limits))
+        elif args.json:
+            for path in args.files:
+                with open(path) as fp:
+                    shape.merge(infer(json.load(fp), *limits))
+        elif not args.files:
+            shape = infer((json.loads(line) for line in sys.stdin
+                           if line.strip()), *limits)
+        elif args.jobs > 1:
+            pool = multiprocessing.Pool(args.jobs)
+            try:
+                tasks = [shard + limits
+                         for shard in shards(args.files, args.jobs)]
+                for state in pool.imap(_infer_shard, tasks):
+                    shape.merge(Shape.from_state(state, *limits))
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for path in args.files:
+                shape.merge(infer_lines(path, 0, None, *limits))
+    except ValueError as e:
+        raise SystemExit(e)
+
+    if args.state:
+        with open(args.state, "w") as fp:
+            json.dump(shape.to_state(), fp, separators=(",", ":"))
+    else:
+        try:
+            sys.stdout.write(to_yaddle(shape))
+        except ValueError as e:
+            raise SystemExit(e)
+
+
+if __name__ == '__main__':
+    main()
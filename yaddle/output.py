@@ -0,0 +1,78 @@
+"""writing generated schemas
+
+three modes
+
+- ``pretty``, sorted and indented by four spaces, what the cli always wrote
+- ``compact``, no whitespace, keys in the order they were generated
+- ``canonical``, no whitespace, sorted keys and ascii only, so the same
+  schema always gives the same bytes
+
+compact and canonical output is written member by member with the C
+encoder, never holding more than one property or definition as a string
+"""
+
+import hashlib
+import json
+
+MODES = ("pretty", "compact", "canonical")
+DEPTH = 3
+
+_pretty = json.JSONEncoder(sort_keys=True, indent=4, separators=(",", ": "))
+_encoders = {
+    "compact": json.JSONEncoder(separators=(",", ":")),
+    "canonical": json.JSONEncoder(sort_keys=True, separators=(",", ":")),
+}
+
+
+def _chunks(obj, encode, sort, depth):
+    if not depth or not obj or not isinstance(obj, (dict, list)):
+        yield encode(obj)
+    elif isinstance(obj, dict):
+        sep = "{"
+        for key in (sorted(obj) if sort else obj):
+            yield sep + encode(key) + ":"
+            for chunk in _chunks(obj[key], encode, sort, depth - 1):
+                yield chunk
+            sep = ","
+        yield "}"
+    else:
+        sep = "["
+        for item in obj:
+            yield sep
+            for chunk in _chunks(item, encode, sort, depth - 1):
+                yield chunk
+            sep = ","
+        yield "]"
+
+
+def iterencode(obj, mode="canonical"):
+    "json text of obj in chunks"
+    if mode == "pretty":
+        return _pretty.iterencode(obj)
+    if mode not in _encoders:
+        raise ValueError("Unknown output mode %s" % mode)
+    return _chunks(obj, _encoders[mode].encode, mode == "canonical", DEPTH)
+
+
+def dumps(obj, mode="canonical"):
+    if mode == "pretty":
+        return _pretty.encode(obj)
+    return "".join(iterencode(obj, mode))
+
+
+def dump(obj, fp, mode="canonical", hasher=None):
+    """write obj to the text file fp, hasher, a ``hashlib`` object, is fed
+    the written bytes so a canonical dump also yields the schema_hash
+    """
+    for chunk in iterencode(obj, mode):
+        fp.write(chunk)
+        if hasher is not None:
+            hasher.update(chunk.encode("utf-8"))
+
+
+def schema_hash(obj):
+    "sha256 of the canonical output, without building it as one string"
+    hasher = hashlib.sha256()
+    for chunk in iterencode(obj, "canonical"):
+        hasher.update(chunk.encode("utf-8"))
+    return hasher.hexdigest()
@@ -0,0 +1,121 @@
+"""compiled ``/regexp/`` patterns
+
+patterns are compiled once into a bounded cache shared by ``loads`` and
+the validator, so a bad pattern fails when the schema is loaded
+"""
+
+import re
+import threading
+import warnings
+from collections import OrderedDict
+
+CACHE_SIZE = 512
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+class UnsafePatternWarning(UserWarning):
+    pass
+
+
+def compile_pattern(pattern):
+    "compiled regex for pattern, raises ValueError if it doesn't compile"
+    with _lock:
+        compiled = _cache.get(pattern)
+        if compiled is not None:
+            _cache.pop(pattern)
+            _cache[pattern] = compiled
+            return compiled
+    try:
+        compiled = re.compile(pattern)
+    except re.error as e:
+        raise ValueError("Bad pattern /%s/: %s" % (pattern, e))
+    with _lock:
+        _cache[pattern] = compiled
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+def _quantifier(pattern, i):
+    """length of the quantifier at i and whether it repeats without bound
+
+    bounded repeats like {2,4} don't count, they can't blow up on their own
+    """
+    if i >= len(pattern):
+        return (0, False)
+    c = pattern[i]
+    if c in "*+":
+        n = 1
+        unbounded = True
+    elif c == "?":
+        n = 1
+        unbounded = False
+    elif c == "{":
+        end = pattern.find("}", i)
+        body = pattern[i + 1:end] if end > 0 else ""
+        if not re.match(r"^\d*(,\d*)?$", body) or not body.strip(","):
+            return (0, False)
+        n = end - i + 1
+        unbounded = body.endswith(",")
+    else:
+        return (0, False)
+    if i + n < len(pattern) and pattern[i + n] in "?+":
+        n += 1
+    return (n, unbounded)
+
+
+def is_unsafe(pattern):
+    """whether pattern repeats a group that itself contains an unbounded
+    repeat, like ``(a+)+`` or ``(/[^/]+)*``, which backtracks exponentially
+    on input that almost matches
+    """
+    stack = [False]
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        inner = False
+        if c == "\\":
+            i += 2
+        elif c == "[":
+            i += 1
+            if i < n and pattern[i] == "^":
+                i += 1
+            if i < n and pattern[i] == "]":
+                i += 1
+            while i < n and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+        elif c == "(":
+            stack.append(False)
+            i += 1
+            continue
+        elif c == ")":
+            inner = stack.pop() if len(stack) > 1 else False
+            i += 1
+        else:
+            i += 1
+        (length, unbounded) = _quantifier(pattern, i)
+        if length:
+            if inner and unbounded:
+                return True
+            i += length
+        stack[-1] = stack[-1] or inner or unbounded
+    return False
+
+
+def check_pattern(pattern):
+    "compile pattern, warning with UnsafePatternWarning if it is unsafe"
+    compiled = compile_pattern(pattern)
+    if is_unsafe(pattern):
+        warnings.warn("pattern /%s/ has nested quantifiers and may "
+                      "backtrack catastrophically" % pattern,
+                      UnsafePatternWarning, stacklevel=2)
+    return compiled
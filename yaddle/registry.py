@@ -0,0 +1,172 @@
+"""named schemas shared by pre-fork worker pools
+
+compile everything once in the parent, then either fork, after
+``freeze()`` so workers share the compiled validators copy-on-write, or
+``dump()`` the generated schemas to a file that spawned workers
+``attach()`` to, the file is mapped read-only so every worker shares
+the same pages and only decodes the schemas it actually uses
+
+    registry = Registry()
+    registry.add_file("user.ydl")
+    registry.dump("schemas.ydlr")
+    # in a worker
+    validate = Registry.attach("schemas.ydlr").validator("user")
+
+validators are closures and can't live in shared memory, each worker
+compiles the ones it uses on first access
+"""
+
+import gc
+import json
+import mmap
+import os
+import struct
+
+from .yaddle import load, loads
+from .validator import compile_schema
+
+MAGIC = b"YDLR\x01"
+HEADER = struct.Struct(">5sI")
+
+
+class Registry(object):
+
+    def __init__(self):
+        self._schemas = {}
+        self._validators = {}
+
+    def add(self, name, source):
+        "generate the schema for yaddle source and store it under name"
+        self._schemas[name] = loads(source)
+        self._validators.pop(name, None)
+
+    def add_schema(self, name, schema):
+        "store a schema generated elsewhere"
+        self._schemas[name] = schema
+        self._validators.pop(name, None)
+
+    def add_file(self, path, name=None):
+        "add a schema file, named after its basename by default"
+        if name is None:
+            name = os.path.splitext(os.path.basename(path))[0]
+        with open(path) as fp:
+            self._schemas[name] = load(fp)
+        self._validators.pop(name, None)
+        return name
+
+    def names(self):
+        return sorted(self._schemas)
+
+    def __contains__(self, name):
+        return name in self._schemas
+
+    def __len__(self):
+        return len(self._schemas)
+
+    def schema(self, name):
+        return self._schemas[name]
+
+    def validator(self, name):
+        validate = self._validators.get(name)
+        if validate is None:
+            validate = self._validators[name] = compile_schema(
+                self.schema(name))
+        return validate
+
+    def validate(self, name, value):
+        return self.validator(name)(value)
+
+    def freeze(self):
+        """compile every validator and move them out of the reach of the
+        garbage collector, call it right before forking so that workers
+        don't touch, and thus copy, the shared pages
+        """
+        for name in self.names():
+            self.validator(name)
+        gc.collect()
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+        return self
+
+    def dump(self, path):
+        """write every schema as compact json behind an index of offsets,
+        the file is replaced atomically so attached workers keep their map
+        """
+        index = {}
+        blobs = []
+        offset = 0
+        for name in self.names():
+            blob = json.dumps(self.schema(name), sort_keys=True,
+                              separators=(",", ":")).encode("utf-8")
+            index[name] = [offset, len(blob)]
+            blobs.append(blob)
+            offset += len(blob)
+        header = json.dumps(index, sort_keys=True,
+                            separators=(",", ":")).encode("utf-8")
+        tmp = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp, "wb") as fp:
+            fp.write(HEADER.pack(MAGIC, len(header)))
+            fp.write(header)
+            for blob in blobs:
+                fp.write(blob)
+        getattr(os, "replace", os.rename)(tmp, path)
+
+    @classmethod
+    def attach(cls, path):
+        return MappedRegistry(path)
+
+
+class MappedRegistry(Registry):
+    "read-only registry over a file written by ``Registry.dump``"
+
+    def __init__(self, path):
+        Registry.__init__(self)
+        with open(path, "rb") as fp:
+            size = os.fstat(fp.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError("Not a schema registry: %s" % path)
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, length) = HEADER.unpack(self._map[:HEADER.size])
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError("Not a schema registry: %s" % path)
+        start = HEADER.size + length
+        self._index = dict(
+            (name, (start + offset, start + offset + size))
+            for (name, (offset, size)) in json.loads(
+                self._map[HEADER.size:start].decode("utf-8")).items())
+
+    def add(self, name, source):
+        raise TypeError("Attached registries are read-only")
+
+    def add_file(self, path, name=None):
+        raise TypeError("Attached registries are read-only")
+
+    def add_schema(self, name, schema):
+        raise TypeError("Attached registries are read-only")
+
+    def names(self):
+        return sorted(self._index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def schema(self, name):
+        schema = self._schemas.get(name)
+        if schema is None:
+            (start, end) = self._index[name]
+            schema = self._schemas[name] = json.loads(
+                self._map[start:end].decode("utf-8"))
+        return schema
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,277 @@
+"""validation over http for services that can't import yaddle
+
+    python -m yaddle.server schemas/ --port 8000
+
+every ``.yaddle`` or ``.ydl`` file of the directory is compiled on start
+and again when it changes, the new set replaces the old one at once so
+requests never see half of a reload
+
+``POST /validate/<schema>``
+    body is one json document, the reply is ``{"valid": true}`` or
+    ``{"valid": false, "error": ..., "path": [...]}``
+``POST /validate/<schema>?batch``
+    body is a json array of documents, the reply is ``{"results": [...]}``
+``GET /schemas``
+    names of the loaded schemas and files that failed to load
+``GET /metrics``
+    request counts, throughput and latency percentiles
+
+connections are kept alive, with ``--processes`` the listening socket is
+shared by forked workers, forking needs a unix. Metrics are per process,
+``/metrics`` reports the worker that happened to take the connection, its
+pid is in the reply
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlsplit
+
+from .registry import Registry
+from .validator import ValidationError
+
+EXTENSIONS = (".yaddle", ".ydl")
+
+
+class SchemaStore(object):
+    "compiled schemas of a directory, reloaded when its files change"
+
+    def __init__(self, directory, extensions=EXTENSIONS):
+        self.directory = directory
+        self.extensions = extensions
+        self.registry = Registry()
+        self.errors = {}
+        self._signature = None
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _files(self):
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(self.extensions):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                yield (path, stat.st_mtime, stat.st_size)
+
+    def reload(self):
+        """recompile if any file changed, return whether it did
+
+        a file that fails to compile keeps its previous version, if any
+        """
+        with self._lock:
+            files = list(self._files())
+            if files == self._signature:
+                return False
+            (previous, registry) = (self.registry, Registry())
+            errors = {}
+            for (path, _, _) in files:
+                name = os.path.splitext(os.path.basename(path))[0]
+                try:
+                    registry.add_file(path, name)
+                    registry.validator(name)
+                except Exception as e:
+                    errors[os.path.basename(path)] = str(e)
+                    if name in previous:
+                        registry.add_schema(name, previous.schema(name))
+                        registry.validator(name)
+            (self.registry, self.errors) = (registry, errors)
+            self._signature = files
+            return True
+
+    def watch(self, interval=1.0):
+        "reload in a daemon thread every interval seconds"
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except OSError:
+                    pass
+        thread = threading.Thread(target=loop, name="yaddle-reload")
+        thread.daemon = True
+        thread.start()
+        return thread
+
+
+class Metrics(object):
+    "counters and a window of recent latencies"
+
+    def __init__(self, window=10000):
+        self.started = time.time()
+        self.requests = 0
+        self.documents = 0
+        self.invalid = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds, documents=0, invalid=0, error=False):
+        with self._lock:
+            self.requests += 1
+            self.documents += documents
+            self.invalid += invalid
+            self.errors += bool(error)
+            self.latencies.append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            uptime = time.time() - self.started
+            ret = {"pid": os.getpid(), "uptime": uptime,
+                   "requests": self.requests, "documents": self.documents,
+                   "invalid": self.invalid, "errors": self.errors,
+                   "documents_per_second": self.documents / uptime}
+        for p in (50, 90, 99):
+            key = "p%d_ms" % p
+            ret[key] = None
+            if latencies:
+                index = min(len(latencies) - 1, len(latencies) * p // 100)
+                ret[key] = latencies[index] * 1000
+        return ret
+
+
+def check(validate, document):
+    try:
+        validate(document)
+    except ValidationError as e:
+        return {"valid": False, "error": e.message, "path": list(e.path)}
+    return {"valid": True}
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    server_version = "yaddle"
+    disable_nagle_algorithm = True
+
+    def reply(self, status, body):
+        data = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/metrics":
+            self.reply(200, self.server.metrics.snapshot())
+        elif path == "/schemas":
+            store = self.server.store
+            self.reply(200, {"schemas": store.registry.names(),
+                             "errors": store.errors})
+        else:
+            self.reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        started = time.time()
+        try:
+            (status, body, documents, invalid) = self.validate()
+        except Exception as e:
+            (status, body, documents, invalid) = (
+                500, {"error": "%s: %s" % (type(e).__name__, e)}, 0, 0)
+        # recorded first so /metrics never lags a reply the client has
+        self.server.metrics.record(time.time() - started, documents, invalid,
+                                   error=status != 200)
+        self.reply(status, body)
+
+    def validate(self):
+        "status, reply, number of documents and how many are invalid"
+        url = urlsplit(self.path)
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self.close_connection = True
+            return (400, {"error": "bad content-length"}, 0, 0)
+        body = self.rfile.read(length)
+        prefix = "/validate/"
+        if not url.path.startswith(prefix):
+            return (404, {"error": "not found"}, 0, 0)
+        name = url.path[len(prefix):]
+        registry = self.server.store.registry
+        if name not in registry:
+            return (404, {"error": "unknown schema %s" % name}, 0, 0)
+        try:
+            document = json.loads(body.decode("utf-8"))
+        except (ValueError, RuntimeError) as e:
+            # RuntimeError is the RecursionError of too deeply nested json
+            return (400, {"error": "bad json: %s" % e}, 0, 0)
+        validate = registry.validator(name)
+        if "batch" in [part.split("=")[0] for part in url.query.split("&")]:
+            if not isinstance(document, list):
+                return (400, {"error": "batch must be an array"}, 0, 0)
+            results = [check(validate, item) for item in document]
+            invalid = sum(1 for result in results if not result["valid"])
+            return (200, {"results": results}, len(results), invalid)
+        result = check(validate, document)
+        return (200, result, 1, int(not result["valid"]))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class ValidationServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, address, store, verbose=False):
+        HTTPServer.__init__(self, address, Handler)
+        self.store = store
+        self.metrics = Metrics()
+        self.verbose = verbose
+
+
+def serve(directory, host="127.0.0.1", port=8000, processes=1,
+          interval=1.0, verbose=False):
+    store = SchemaStore(directory)
+    for (name, error) in sorted(store.errors.items()):
+        sys.stderr.write("%s: %s\n" % (name, error))
+    server = ValidationServer((host, port), store, verbose)
+    store.registry.freeze()
+    for _ in range(processes - 1):
+        if os.fork() == 0:
+            break
+    server.metrics = Metrics()
+    if interval:
+        store.watch(interval)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m yaddle.server",
+        description="validate json documents against yaddle schemas")
+    parser.add_argument("directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="seconds between checks for changed files, "
+                             "0 disables reloading")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    serve(args.directory, args.host, args.port, args.processes,
+          args.interval, args.verbose)
+
+
+if __name__ == '__main__':
+    main()
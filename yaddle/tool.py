@@ -1,29 +1,41 @@
+import argparse
+import hashlib
 import sys
-import json
 import yaddle
+from yaddle import output
 
 
-def main():
-    if len(sys.argv) == 1:
-        infile = sys.stdin
-        outfile = sys.stdout
-    elif len(sys.argv) == 2:
-        infile = open(sys.argv[1], 'rb')
-        outfile = sys.stdout
-    elif len(sys.argv) == 3:
-        infile = open(sys.argv[1], 'rb')
-        outfile = open(sys.argv[2], 'wb')
-    else:
-        raise SystemExit(sys.argv[0] + " [infile [outfile]]")
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m yaddle.tool")
+    parser.add_argument("infile", nargs="?")
+    parser.add_argument("outfile", nargs="?")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--compact", action="store_const", dest="mode",
+                      const="compact", help="no whitespace, unsorted keys")
+    mode.add_argument("--canonical", action="store_const", dest="mode",
+                      const="canonical",
+                      help="no whitespace, sorted keys, stable bytes")
+    parser.add_argument("--hash", action="store_true",
+                        help="write the canonical output and print its "
+                             "sha256 to stderr")
+    args = parser.parse_args(argv)
+    if args.hash and args.mode not in (None, "canonical"):
+        parser.error("--hash needs the canonical output")
+
+    infile = open(args.infile) if args.infile else sys.stdin
+    outfile = open(args.outfile, "w") if args.outfile else sys.stdout
     with infile:
         try:
             obj = yaddle.load(infile)
-        except ValueError, e:
+        except ValueError as e:
             raise SystemExit(e)
+    hasher = hashlib.sha256() if args.hash else None
     with outfile:
-        json.dump(obj, outfile, sort_keys=True,
-                  indent=4, separators=(',', ': '))
+        output.dump(obj, outfile, "canonical" if args.hash
+                    else args.mode or "pretty", hasher)
         outfile.write('\n')
+    if hasher is not None:
+        sys.stderr.write(hasher.hexdigest() + '\n')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,312 @@
+"""validate data against schemas generated by yaddle
+
+``compile_schema`` turns the json-schema produced by ``loads`` into a
+tree of closures once, so validating a document doesn't walk the schema
+dict again
+"""
+
+from numbers import Number
+
+from . import formats as _formats
+from .patterns import compile_pattern, check_pattern
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+
+class ValidationError(ValueError):
+
+    def __init__(self, message, path=()):
+        self.message = message
+        self.path = tuple(path)
+        if self.path:
+            message = "%s: %s" % ("/".join(map(str, self.path)), message)
+        ValueError.__init__(self, message)
+
+
+def _is_number(value):
+    return isinstance(value, Number) and not isinstance(value, bool)
+
+
+def _is_integer(value):
+    if not _is_number(value):
+        return False
+    return not isinstance(value, float) or value.is_integer()
+
+
+TYPES = {
+    "string": lambda value: isinstance(value, basestring),
+    "number": _is_number,
+    "integer": _is_integer,
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+    "array": lambda value: isinstance(value, (list, tuple)),
+    "object": lambda value: isinstance(value, dict),
+}
+
+
+def is_multiple(value, step):
+    """whether value is a multiple of step, exactly for integral numbers,
+    within 1e-9 otherwise, a quotient too large for a float is not
+    """
+    if _is_integer(value) and _is_integer(step) and step:
+        return int(value) % int(step) == 0
+    try:
+        quotient = value / step
+    except (OverflowError, ZeroDivisionError):
+        return False
+    if quotient != quotient or quotient in (float("inf"), float("-inf")):
+        return False
+    return abs(quotient - round(quotient)) <= 1e-9
+
+
+def freeze(value):
+    "hashable form of a json value, keeping true apart from 1"
+    if isinstance(value, bool):
+        return ("b", value)
+    if isinstance(value, dict):
+        return ("o", frozenset((k, freeze(v)) for (k, v) in value.items()))
+    if isinstance(value, (list, tuple)):
+        return ("a", tuple(map(freeze, value)))
+    if _is_number(value):
+        return ("n", value)
+    return ("s", value)
+
+
+def compile_schema(schema, formats=None, check_patterns=False):
+    """return a function raising ValidationError for invalid documents
+
+    ``formats`` maps format names to checkers and takes precedence over
+    the registry in ``yaddle.formats``, checkers are looked up here and
+    not at validation time
+
+    with ``check_patterns`` patterns prone to catastrophic backtracking
+    emit an UnsafePatternWarning
+    """
+    definitions = {}
+    compiler = _Compiler(definitions, formats or {}, check_patterns)
+    for (name, sub) in schema.get("definitions", {}).items():
+        definitions[name] = compiler.compile(sub)
+    check = compiler.compile(schema)
+
+    def validate(value, path=()):
+        check(value, path)
+        return value
+    return validate
+
+
+def validate(schema, value):
+    return compile_schema(schema)(value)
+
+
+def is_valid(validate, value):
+    try:
+        validate(value)
+    except ValidationError:
+        return False
+    return True
+
+
+def _fail(message, path):
+    raise ValidationError(message, path)
+
+
+class _Compiler(object):
+
+    def __init__(self, definitions, formats, check_patterns):
+        self.definitions = definitions
+        self.formats = formats
+        self.compile_pattern = check_pattern if check_patterns \
+            else compile_pattern
+
+    def compile(self, schema):
+        checks = []
+        if "$ref" in schema:
+            checks.append(self.ref(schema["$ref"]))
+        if "type" in schema:
+            checks.append(self.type(schema["type"]))
+        if "enum" in schema:
+            checks.append(self.enum(schema["enum"]))
+        if "format" in schema:
+            check = self.format(schema["format"])
+            if check is not None:
+                checks.append(check)
+        for keyword in ("anyOf", "oneOf", "allOf"):
+            if keyword in schema:
+                checks.append(self.combine(keyword, schema[keyword]))
+        tp = schema.get("type")
+        if tp == "string":
+            checks.extend(self.string(schema))
+        elif tp in ("number", "integer"):
+            checks.extend(self.number(schema))
+        elif tp == "array":
+            checks.extend(self.array(schema))
+        elif tp == "object":
+            checks.extend(self.object(schema))
+
+        if not checks:
+            return lambda value, path: None
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value, path):
+            for check in checks:
+                check(value, path)
+        return check_all
+
+    def ref(self, ref):
+        prefix = "#/definitions/"
+        if not ref.startswith(prefix):
+            raise ValueError("Unsupported reference %s" % ref)
+        name = ref[len(prefix):]
+        definitions = self.definitions
+
+        def check(value, path):
+            if name not in definitions:
+                _fail("undefined reference %s" % ref, path)
+            definitions[name](value, path)
+        return check
+
+    def type(self, tp):
+        is_type = TYPES[tp]
+
+        def check(value, path):
+            if not is_type(value):
+                _fail("expected %s" % tp, path)
+        return check
+
+    def enum(self, items):
+        allowed = frozenset(map(freeze, items))
+
+        def check(value, path):
+            if freeze(value) not in allowed:
+                _fail("%r not in %r" % (value, items), path)
+        return check
+
+    def format(self, name):
+        checker = self.formats.get(name) or _formats.get_format(name)
+        if checker is None:
+            return None
+
+        def check(value, path):
+            if isinstance(value, basestring) and not checker(value):
+                _fail("%r is not a valid %s" % (value, name), path)
+        return check
+
+    def combine(self, keyword, schemas):
+        checks = list(map(self.compile, schemas))
+
+        if keyword == "allOf":
+            def check(value, path):
+                for sub in checks:
+                    sub(value, path)
+        elif keyword == "anyOf":
+            def check(value, path):
+                for sub in checks:
+                    try:
+                        sub(value, path)
+                        return
+                    except ValidationError:
+                        pass
+                _fail("matches none of anyOf", path)
+        else:
+            def check(value, path):
+                count = 0
+                for sub in checks:
+                    try:
+                        sub(value, path)
+                        count += 1
+                    except ValidationError:
+                        pass
+                if count != 1:
+                    _fail("must match exactly one of oneOf", path)
+        return check
+
+    def string(self, schema):
+        lo = schema.get("minLength")
+        hi = schema.get("maxLength")
+        if lo is not None or hi is not None:
+            def check_length(value, path):
+                if lo is not None and len(value) < lo:
+                    _fail("shorter than %d" % lo, path)
+                if hi is not None and len(value) > hi:
+                    _fail("longer than %d" % hi, path)
+            yield check_length
+        if "pattern" in schema:
+            pattern = schema["pattern"]
+            search = self.compile_pattern(pattern).search
+
+            def check_pattern(value, path):
+                if not search(value):
+                    _fail("%r does not match /%s/" % (value, pattern), path)
+            yield check_pattern
+
+    def number(self, schema):
+        lo = schema.get("minimum")
+        hi = schema.get("maximum")
+        step = schema.get("multipleOf")
+        if lo is not None or hi is not None:
+            def check_range(value, path):
+                if lo is not None and value < lo:
+                    _fail("less than %s" % lo, path)
+                if hi is not None and value > hi:
+                    _fail("greater than %s" % hi, path)
+            yield check_range
+        if step is not None:
+            def check_step(value, path):
+                if not is_multiple(value, step):
+                    _fail("not a multiple of %s" % step, path)
+            yield check_step
+
+    def array(self, schema):
+        items = schema.get("items")
+        if isinstance(items, dict):
+            check_item = self.compile(items)
+
+            def check_items(value, path):
+                for (i, item) in enumerate(value):
+                    check_item(item, path + (i,))
+            yield check_items
+        elif items:
+            checks = list(map(self.compile, items))
+
+            def check_tuple(value, path):
+                for (i, (check, item)) in enumerate(zip(checks, value)):
+                    check(item, path + (i,))
+            yield check_tuple
+        lo = schema.get("minItems")
+        hi = schema.get("maxItems")
+        if lo is not None or hi is not None:
+            def check_size(value, path):
+                if lo is not None and len(value) < lo:
+                    _fail("fewer than %d items" % lo, path)
+                if hi is not None and len(value) > hi:
+                    _fail("more than %d items" % hi, path)
+            yield check_size
+        if schema.get("uniqueItems"):
+            def check_unique(value, path):
+                if len(set(map(freeze, value))) != len(value):
+                    _fail("items are not unique", path)
+            yield check_unique
+
+    def object(self, schema):
+        properties = [(k, self.compile(v))
+                      for (k, v) in schema.get("properties", {}).items()]
+        required = schema.get("required", ())
+        sealed = schema.get("additionalProperties") is False
+        known = frozenset(schema.get("properties", ()))
+
+        def check(value, path):
+            for key in required:
+                if key not in value:
+                    _fail("missing %s" % key, path)
+            for (key, check_property) in properties:
+                if key in value:
+                    check_property(value[key], path + (key,))
+            if sealed:
+                for key in value:
+                    if key not in known:
+                        _fail("unexpected %s" % key, path)
+        yield check
@@ -1,7 +1,16 @@
+import re
+
 from funcparserlib.parser import (some, a, many, skip, finished, maybe,
                                   forward_decl, oneplus)
 from funcparserlib.lexer import make_tokenizer, Token
 
+from . import patterns
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
 
 def tokenize(input):
     token_specs = [
@@ -102,8 +111,8 @@ def parse(tokens):
     null_ = const('null') >> always(None)
 
     enum_item = (num | true | false | null_ | name | raw_string)
-    enum = many(enum_item + skip(op("|"))) + enum_item >> append \
-        >> anno("enum")
+    enum = many(enum_item + skip(op("|"))) + enum_item \
+        >> (lambda head_tail: head_tail[0] + [head_tail[1]]) >> anno("enum")
 
     boolean = const("bool") >> always(None) >> anno("boolean")
     null = const("null") >> always(None) >> anno("null")
@@ -182,6 +191,7 @@ def generate_schema(node):
             if nmax is not None:
                 ret["maxLength"] = nmax
         if pattern is not None:
+            patterns.compile_pattern(pattern)
             ret["pattern"] = pattern
         return ret
     elif tp == "number" or tp == "integer":
@@ -258,3 +268,103 @@ def loads(source):
 
 def load(fp):
     return loads(fp.read())
+
+
+DEFINITION = re.compile(r"^@([A-Za-z_][A-Za-z_0-9-]*)[ \t]*:")
+
+
+def index_definitions(source):
+    """map the name of every top level definition to its source block
+
+    a block starts with ``@name:`` at the beginning of a line and runs until
+    the next unindented line, nothing is tokenized
+    """
+    index = {}
+    name = None
+    for line in source.splitlines(True):
+        if line[:1] not in ("", " ", "\t", "\r", "\n", "#"):
+            match = DEFINITION.match(line)
+            name = match.group(1) if match else None
+            if name is not None:
+                index[name] = []
+        if name is not None:
+            index[name].append(line)
+    return dict((k, "".join(v)) for (k, v) in index.items())
+
+
+def references(node):
+    "names of the definitions node refers to"
+    (tp, val) = node
+    if tp == "ref":
+        return set([val])
+    refs = set()
+    if tp == "array":
+        children = val[0]
+    elif tp == "object":
+        children = list(val[0].values()) + list(val[3].values())
+    elif tp in ("anyof", "oneof", "allof"):
+        children = val
+    else:
+        children = ()
+    for child in children:
+        refs.update(references(child))
+    return refs
+
+
+class Definitions(Mapping):
+    "parsed definitions, their schemas are generated on first access"
+
+    def __init__(self, nodes):
+        self._nodes = nodes
+        self._schemas = {}
+
+    def __getitem__(self, name):
+        schema = self._schemas.get(name)
+        if schema is None:
+            schema = self._schemas[name] = generate_schema(self._nodes[name])
+        return schema
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def schema(self, name):
+        "schema for name, with the definitions it depends on embedded"
+        ret = dict(self[name])
+        defs = dict((k, self[k]) for k in self._closure([name]))
+        if defs:
+            ret["definitions"] = defs
+        return ret
+
+    def _closure(self, names):
+        seen = set()
+        pending = list(names)
+        while pending:
+            for ref in references(self._nodes[pending.pop()]):
+                if ref not in seen:
+                    seen.add(ref)
+                    pending.append(ref)
+        return seen
+
+
+def load_definitions(source, names):
+    """parse only the named definitions of source and the ones they refer
+    to, skipping every other block
+
+    load_definitions(source, ["user", "order"])["user"]
+    """
+    index = index_definitions(source)
+    nodes = {}
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in nodes:
+            continue
+        if name not in index:
+            raise ValueError("Undefined definition %s" % name)
+        (_, val) = parse(tokenize(index[name]))
+        nodes[name] = val[3][name]
+        pending.extend(references(nodes[name]))
+    return Definitions(nodes)